@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ocr_cache import DEFAULT_CACHE_DIR, OCRCache
+from ocr_pipeline import process_page
+from enhance import STEPS as ENHANCE_STEPS, parse_steps
+from ocr_preprocess import OCRPreprocessor
+from spell_correct import DEFAULT_INDEX_DIR, SpellCorrector, SpellIndex, ensure_index
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# One EasyOCR reader, cache handle, preprocessing buffer set and spell
+# corrector per worker process, created by the pool initializer
+_reader = None
+_cache = None
+_preprocessor = None
+_corrector = None
+
+
+def _init_worker(gpu, cache_dir, cache_mb, spell_dir, enhance):
+    global _reader, _cache, _preprocessor, _corrector
+    import torch
+    from easyocr import Reader
+
+    # Each process handles one page at a time; torch's own thread pool
+    # would otherwise oversubscribe the cores the pool is already using
+    torch.set_num_threads(1)
+    _reader = Reader(['en'], gpu=gpu, verbose=False)
+    _preprocessor = OCRPreprocessor(enhance=enhance)
+    if cache_dir:
+        _cache = OCRCache(cache_dir, int(cache_mb * 1024 * 1024))
+    if spell_dir:
+        # Memory-mapped, so every process shares the same pages of the index
+        _corrector = SpellCorrector(SpellIndex(spell_dir))
+
+
+def _process(path):
+    hits = _cache.hits if _cache is not None else 0
+    page = process_page(path, _reader, _cache, _preprocessor, _corrector)
+    return page, _cache is not None and _cache.hits > hits
+
+
+def collect_images(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for name in sorted(os.listdir(item)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.join(item, name))
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            print(f"[batch_ocr] Skipping missing input: {item}", file=sys.stderr)
+    return paths
+
+
+def output_names(paths):
+    # Pages from different folders may share a file name
+    names = {}
+    used = set()
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = stem
+        n = 1
+        while name in used:
+            name = f"{stem}_{n}"
+            n += 1
+        used.add(name)
+        names[path] = name
+    return names
+
+
+def write_page(page, output_dir, name, formats):
+    if "json" in formats:
+        with open(os.path.join(output_dir, name + ".json"), 'w', encoding='utf-8') as f:
+            json.dump(page, f, ensure_ascii=False, indent=2)
+    if "txt" in formats:
+        with open(os.path.join(output_dir, name + ".txt"), 'w', encoding='utf-8') as f:
+            f.write("\n".join(line["text"] for line in page["lines"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless DOCSee OCR for folders of scanned pages.")
+    parser.add_argument("inputs", nargs="+", help="Image files and/or directories of images")
+    parser.add_argument("-o", "--output", default="ocr_output", help="Directory for per-page results")
+    parser.add_argument("-f", "--format", choices=["json", "txt", "both"], default="both")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--gpu", action="store_true", help="Run EasyOCR on the GPU")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="On-disk OCR result cache")
+    parser.add_argument("--cache-mb", type=float, default=256, help="Cache size cap in MB (LRU eviction)")
+    parser.add_argument("--no-cache", action="store_true", help="Always run OCR, never read or write the cache")
+    parser.add_argument("--spell-index", default=DEFAULT_INDEX_DIR,
+                        help="SymSpell index directory (built on first use)")
+    parser.add_argument("--no-spell", action="store_true", help="Do not spell-correct low-confidence lines")
+    parser.add_argument("--enhance", default="",
+                        help=f"Comma-separated enhancement steps before OCR: {', '.join(ENHANCE_STEPS)}")
+    args = parser.parse_args(argv)
+    try:
+        enhance = parse_steps(args.enhance)
+    except ValueError as e:
+        parser.error(str(e))
+
+    paths = collect_images(args.inputs)
+    if not paths:
+        print("[batch_ocr] No images found.", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    formats = ("json", "txt") if args.format == "both" else (args.format,)
+    names = output_names(paths)
+    workers = max(1, min(args.workers, len(paths)))
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    # Built once here rather than by every worker process at the same time
+    spell_dir = None if args.no_spell else ensure_index(args.spell_index)
+
+    done = 0
+    failed = 0
+    cache_hits = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(args.gpu, cache_dir, args.cache_mb, spell_dir, enhance)) as pool:
+        futures = {pool.submit(_process, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                page, cached = future.result()
+                write_page(page, args.output, names[path], formats)
+                done += 1
+                cache_hits += cached
+            except Exception as e:
+                failed += 1
+                print(f"[batch_ocr ERROR] {path} -> {e}", file=sys.stderr)
+
+            elapsed = time.perf_counter() - start
+            print(f"\r[{done + failed}/{len(paths)}] {done / elapsed:.2f} pages/sec", end="", flush=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"\nProcessed {done} pages ({failed} failed) in {elapsed:.1f}s "
+          f"-> {done / elapsed:.2f} pages/sec with {workers} workers")
+    if cache_dir:
+        print(f"OCR cache: {cache_hits} hits, {done - cache_hits} misses")
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bench_preprocess import synthetic_page
+from enhance import STEPS, TILE_SIZE, PageEnhancer
+from pdf_export import PDFWriter
+
+
+def photographed_page(width, height, rng):
+    # Text page with uneven lighting and sensor noise, as a phone sees it
+    page = synthetic_page(width, height).astype(np.float32)
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    light = 0.65 + 0.35 * np.cos((xs / width - 0.3) * 2.0) * np.cos((ys / height - 0.6) * 1.5)
+    page = page * light[..., None] + rng.normal(0, 6, size=(height, width, 1))
+    return np.clip(page, 0, 255).astype(np.uint8)
+
+
+def run(enhancer, page, repeats):
+    enhancer(page)  # warm-up
+    totals = {}
+    for _ in range(repeats):
+        out = enhancer(page)
+        for step, ms in enhancer.timings.items():
+            totals[step] = totals.get(step, 0.0) + ms
+    return out, {step: ms / repeats for step, ms in totals.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Page enhancement: per-step time, tiled vs whole page.")
+    parser.add_argument("--width", type=int, default=2480, help="Page width (A4 at 300 dpi by default)")
+    parser.add_argument("--height", type=int, default=3508)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    page = photographed_page(args.width, args.height, np.random.default_rng(args.seed))
+    print(f"Page {args.width}x{args.height}, {os.cpu_count()} CPU(s)")
+
+    whole, timings = run(PageEnhancer(STEPS, tile_size=0), page, args.repeats)
+    rows = [("whole page", timings, 0)]
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        enhancer = PageEnhancer(STEPS, tile_size=TILE_SIZE, executor=ThreadPoolExecutor(max_workers=workers))
+        tiled, timings = run(enhancer, page, args.repeats)
+        rows.append((f"tiles, {workers} thread(s)", timings, int(np.count_nonzero(tiled != whole))))
+
+    print(f"{'':<20}" + "".join(f"{step:>10}" for step in (*STEPS, "total")) + f"{'diff px':>9}")
+    for name, timings, diff in rows:
+        print(f"{name:<20}" + "".join(f"{timings[step]:>8.1f}ms" for step in (*STEPS, "total")) + f"{diff:>9}")
+
+    # One page as the PDF stores it: JPEG of the photo vs 1-bit enhanced page
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = {}
+        for name, add in (("JPEG", lambda w: w.add_image(page)), ("bilevel", lambda w: w.add_bilevel(whole))):
+            path = os.path.join(tmp, name + ".pdf")
+            with PDFWriter(path) as writer:
+                add(writer)
+            sizes[name] = os.path.getsize(path)
+    print(f"\nPDF page: JPEG {sizes['JPEG'] / 1e3:.0f} KB, bilevel {sizes['bilevel'] / 1e3:.0f} KB "
+          f"({sizes['JPEG'] / sizes['bilevel']:.1f}x smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from ocr_export import write_alto, write_hocr
+from pdf_export import write_pdf
+
+WORDS = "the quick brown fox jumps over lazy dog invoice total amount date page section".split()
+
+
+def synthetic_results(width, height, lines, rng):
+    # EasyOCR-style line tuples filling the page top to bottom
+    results = []
+    line_h = height // (lines + 2)
+    for n in range(lines):
+        y = (n + 1) * line_h
+        x1 = int(width * rng.uniform(0.5, 0.9))
+        text = " ".join(rng.choice(WORDS, size=rng.integers(3, 9)))
+        results.append(([[60, y], [x1, y], [x1, y + line_h - 8], [60, y + line_h - 8]], text,
+                        float(rng.uniform(0.5, 1.0))))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export time of a fully OCR'd session (no OCR model involved).")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--width", type=int, default=1654, help="Page width (A4 at 200 dpi by default)")
+    parser.add_argument("--height", type=int, default=2339)
+    parser.add_argument("--lines", type=int, default=40, help="OCR lines per page")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+
+    page = np.full((args.height, args.width, 3), 235, dtype=np.uint8)
+    page += rng.integers(0, 15, size=page.shape, dtype=np.uint8)
+    results = [synthetic_results(args.width, args.height, args.lines, rng) for _ in range(args.pages)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jpeg_path = os.path.join(tmp, "page.jpg")
+        cv2.imwrite(jpeg_path, page)
+        size = lambda i: (args.width, args.height)  # noqa: E731
+        runs = [
+            ("image-only PDF, crops encoded", "a.pdf",
+             lambda out: write_pdf(out, args.pages, lambda i: page)),
+            ("searchable PDF, crops encoded", "b.pdf",
+             lambda out: write_pdf(out, args.pages, lambda i: page, text_source=results.__getitem__)),
+            ("searchable PDF, JPEG passthrough", "c.pdf",
+             lambda out: write_pdf(out, args.pages, lambda i: jpeg_path, text_source=results.__getitem__)),
+            ("hOCR", "d.hocr",
+             lambda out: write_hocr(out, args.pages, lambda i: (*size(i), results[i]))),
+            ("ALTO XML", "e.xml",
+             lambda out: write_alto(out, args.pages, lambda i: (*size(i), results[i]))),
+        ]
+        print(f"{args.pages} pages of {args.width}x{args.height}, {args.lines} OCR lines each")
+        print(f"{'export':<34} {'seconds':>8} {'pages/s':>8} {'MB':>7}")
+        for name, filename, run in runs:
+            out = os.path.join(tmp, filename)
+            start = time.perf_counter()
+            run(out)
+            seconds = time.perf_counter() - start
+            print(f"{name:<34} {seconds:8.2f} {args.pages / seconds:8.1f} {os.path.getsize(out) / 1e6:7.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
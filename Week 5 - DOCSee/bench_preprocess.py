@@ -0,0 +1,108 @@
+import argparse
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from ocr_preprocess import OCRPreprocessor
+
+# Functions that allocate a new full frame whenever no dst= buffer is passed in
+_TRACKED_CV2 = ["cvtColor", "resize", "GaussianBlur", "addWeighted", "adaptiveThreshold",
+                "connectedComponentsWithStats"]
+_TRACKED_NP = ["empty", "zeros", "full"]
+
+
+class AllocationCounter:
+    # Counts arrays created by OpenCV/NumPy calls while active: a call counts
+    # as an allocation when its output array is not one that was passed in
+
+    def __init__(self, min_bytes=64 * 1024):
+        self.min_bytes = min_bytes
+        self.count = 0
+        self.bytes = 0
+        self._saved = []
+
+    def __enter__(self):
+        for module, names in ((cv2, _TRACKED_CV2), (np, _TRACKED_NP)):
+            for name in names:
+                original = getattr(module, name)
+                self._saved.append((module, name, original))
+                setattr(module, name, self._wrap(original))
+        return self
+
+    def __exit__(self, *exc):
+        for module, name, original in self._saved:
+            setattr(module, name, original)
+        self._saved.clear()
+
+    def _wrap(self, func):
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            passed = [id(a) for a in list(args) + list(kwargs.values()) if isinstance(a, np.ndarray)]
+            outputs = result if isinstance(result, tuple) else (result,)
+            for out in outputs:
+                if isinstance(out, np.ndarray) and id(out) not in passed and out.nbytes >= self.min_bytes:
+                    self.count += 1
+                    self.bytes += out.nbytes
+            return result
+        return wrapper
+
+
+def legacy_preprocess(image):
+    # OCRWorker.run before the preprocessing object: four full-frame copies
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    sharpened = cv2.addWeighted(gray, 1.5, cv2.GaussianBlur(gray, (0, 0), 1), -0.5, 0)
+    return cv2.cvtColor(sharpened, cv2.COLOR_GRAY2RGB)
+
+
+def synthetic_page(width, height):
+    page = np.full((height, width, 3), 235, dtype=np.uint8)
+    for y in range(80, height - 40, 60):
+        cv2.putText(page, "Allocation-free preprocessing 0123", (40, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (30, 30, 30), 2)
+    return page
+
+
+def measure(name, func, page, pages):
+    func(page)  # warm-up: first page fills any reusable buffers
+
+    with AllocationCounter() as counter:
+        func(page)
+    tracemalloc.start()
+    func(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        func(page)
+    elapsed = time.perf_counter() - start
+
+    megapixels = page.shape[0] * page.shape[1] / 1e6
+    print(f"{name:<28} {counter.count:>6} {counter.bytes / 1e6:>10.1f} {peak / 1e6:>9.1f} "
+          f"{elapsed / pages / megapixels * 1000:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Allocation and time per megapixel for OCR preprocessing.")
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    page = synthetic_page(args.width, args.height)
+    print(f"{args.width}x{args.height} page, {args.pages} pages per timing, steady state after one warm-up page")
+    print(f"{'pipeline':<28} {'allocs':>6} {'alloc MB':>10} {'peak MB':>9} {'ms/MP':>9}")
+
+    measure("legacy (before)", legacy_preprocess, page, args.pages)
+    no_governor = OCRPreprocessor(governor=False)
+    measure("OCRPreprocessor, no governor", lambda p: no_governor(p), page, args.pages)
+    with_governor = OCRPreprocessor()
+    measure("OCRPreprocessor", lambda p: with_governor(p), page, args.pages)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
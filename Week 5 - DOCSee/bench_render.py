@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtCore import Qt  # noqa: E402
+from PyQt5.QtGui import QImage, QPixmap  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from qt_render import to_pixmap  # noqa: E402
+
+# Frame source, size it is shown at
+CASES = [
+    ("webcam 1280x720", (720, 1280), (640, 480)),
+    ("webcam 1920x1080", (1080, 1920), (640, 480)),
+    ("photo 12 MP", (3000, 4000), (640, 480)),
+    ("photo 12 MP, popup", (3000, 4000), (450, 600)),
+    ("photo 48 MP", (6000, 8000), (640, 480)),
+]
+
+
+def legacy_pixmap(image, max_width, max_height):
+    # Display path before qt_render: full-size RGB copy, full-size QPixmap,
+    # then Qt's smooth scaling
+    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb.shape
+    qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
+    pixmap = QPixmap.fromImage(qimg)
+    return pixmap.scaled(max_width, max_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def measure(func, image, size, repeats):
+    func(image, *size)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        pixmap = func(image, *size)
+    return pixmap, (time.perf_counter() - start) / repeats * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time per displayed frame: ndarray -> scaled QPixmap.")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed conversions per case and method")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)  # QPixmap needs one
+    rng = np.random.default_rng(args.seed)
+
+    print(f"Qt platform: {app.platformName()}")  # pixmap uploads cost differ between platforms
+    print(f"{'frame':<20} {'shown at':>9} {'before ms':>10} {'after ms':>9} {'speed-up':>9}")
+    for name, (h, w), size in CASES:
+        image = rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+        old, old_ms = measure(legacy_pixmap, image, size, args.repeats)
+        new, new_ms = measure(to_pixmap, image, size, args.repeats)
+        if (old.width(), old.height()) != (new.width(), new.height()):
+            print(f"[bench_render ERROR] {name}: {old.width()}x{old.height()} != {new.width()}x{new.height()}")
+        print(f"{name:<20} {f'{size[0]}x{size[1]}':>9} {old_ms:10.2f} {new_ms:9.2f} {old_ms / new_ms:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import argparse
+import difflib
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from ocr_pipeline import run_ocr_batch
+from ocr_preprocess import OCRPreprocessor, estimate_text_height, governor_scale
+
+LINES = [
+    "INVOICE 2024-0192 DOCSEE LTD",
+    "Delivery address: 42 Harbour Road",
+    "Total amount due: 1,284.50 EUR",
+    "Payment within 30 days of receipt",
+    "Thank you for your business",
+]
+
+# (width, height, font scale) - phone photos from 12 to 48 MP
+SIZES = [(4000, 3000, 3.0), (6000, 4000, 4.5), (8000, 6000, 6.0)]
+
+
+def synthetic_page(width, height, font_scale):
+    page = np.full((height, width, 3), 235, dtype=np.uint8)
+    noise = np.random.default_rng(0).integers(0, 12, size=(height, width, 1), dtype=np.uint8)
+    page -= noise
+    thickness = max(1, int(font_scale * 2))
+    step = int(font_scale * 70)
+    y = step
+    for i in range(height // step - 1):
+        cv2.putText(page, LINES[i % len(LINES)], (int(font_scale * 40), y),
+                    cv2.FONT_HERSHEY_SIMPLEX, font_scale, (25, 25, 25), thickness)
+        y += step
+    truth = [LINES[i % len(LINES)] for i in range(height // step - 1)]
+    return page, truth
+
+
+def accuracy(results, truth):
+    text = " ".join(r[1] for r in results)
+    return difflib.SequenceMatcher(None, text, " ".join(truth)).ratio()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolution governor speed/accuracy benchmark on large pages.")
+    parser.add_argument("--estimate-only", action="store_true",
+                        help="Only time the text-height estimate (no EasyOCR models needed)")
+    parser.add_argument("--gpu", action="store_true")
+    args = parser.parse_args(argv)
+
+    reader = None
+    if not args.estimate_only:
+        from easyocr import Reader
+        reader = Reader(['en'], gpu=args.gpu, verbose=False)
+
+    print(f"{'size':>12} {'MP':>5} {'text px':>8} {'scale':>6} {'estimate':>9} "
+          f"{'full s':>8} {'gov s':>8} {'full acc':>9} {'gov acc':>8}")
+    for width, height, font_scale in SIZES:
+        page, truth = synthetic_page(width, height, font_scale)
+        gray = cv2.cvtColor(page, cv2.COLOR_BGR2GRAY)
+
+        start = time.perf_counter()
+        text_height = estimate_text_height(gray)
+        estimate_ms = (time.perf_counter() - start) * 1000
+        scale = governor_scale(gray)
+
+        size = f"{width}x{height}"
+        row = (f"{size:>12} {width * height / 1e6:5.1f} {text_height or 0:8.1f} {scale:6.3f} "
+               f"{estimate_ms:7.1f}ms")
+        if reader is not None:
+            timings = {}
+            scores = {}
+            for governor in (False, True):
+                start = time.perf_counter()
+                results = run_ocr_batch([page], reader, preprocessor=OCRPreprocessor(governor=governor))[0]
+                timings[governor] = time.perf_counter() - start
+                scores[governor] = accuracy(results, truth)
+            row += (f" {timings[False]:8.2f} {timings[True]:8.2f} "
+                    f"{scores[False]:9.3f} {scores[True]:8.3f}")
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import argparse
+import os
+import random
+import shutil
+import string
+import sys
+import tempfile
+import time
+
+from spell_correct import MAX_EDIT_DISTANCE, MIN_WORD_LENGTH, PREFIX_LENGTH, SpellCorrector, SpellIndex, \
+    build_index, default_dictionary
+
+
+def read_dictionary(path):
+    words, counts = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit() and len(parts[0]) >= MIN_WORD_LENGTH:
+                words.append(parts[0].lower())
+                counts.append(int(parts[1]))
+    return words, counts
+
+
+def corrupt(word, rng):
+    # One or two OCR-like edits: drop, duplicate, swap or replace a letter
+    for _ in range(rng.choice((1, 1, 2))):
+        i = rng.randrange(len(word))
+        op = rng.choice(("drop", "dup", "swap", "replace"))
+        if op == "drop" and len(word) > 2:
+            word = word[:i] + word[i + 1:]
+        elif op == "dup":
+            word = word[:i] + word[i] + word[i:]
+        elif op == "swap" and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    return word
+
+
+def token_stream(words, counts, n, error_rate, seed):
+    # Words drawn by corpus frequency, like running text, a share of them garbled
+    rng = random.Random(seed)
+    truth = rng.choices(words, weights=counts, k=n)
+    tokens = [corrupt(w, rng) if rng.random() < error_rate else w for w in truth]
+    return tokens, truth
+
+
+def timed(func, tokens):
+    start = time.perf_counter()
+    out = [func(token) for token in tokens]
+    return out, time.perf_counter() - start
+
+
+def report(name, tokens, truth, out, elapsed):
+    accuracy = sum(o == t for o, t in zip(out, truth)) / len(tokens)
+    print(f"{name:<34} {len(tokens) / elapsed:>12,.0f} {accuracy * 100:>9.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load time and tokens/sec of the memory-mapped SymSpell index.")
+    parser.add_argument("--tokens", type=int, default=20000)
+    parser.add_argument("--error-rate", type=float, default=0.3, help="Share of tokens given OCR-like typos")
+    parser.add_argument("--loads", type=int, default=20, help="Index loads to average")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the in-memory symspellpy comparison")
+    args = parser.parse_args(argv)
+
+    dictionary = default_dictionary()
+    words, counts = read_dictionary(dictionary)
+    tokens, truth = token_stream(words, counts, args.tokens, args.error_rate, args.seed)
+    unique = sorted(set(tokens))
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        index_dir = os.path.join(work_dir, "spell_index")
+        start = time.perf_counter()
+        build_index(index_dir, dictionary)
+        build_s = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(os.path.join(index_dir, n)) for n in os.listdir(index_dir)) / 1e6
+
+        start = time.perf_counter()
+        for _ in range(args.loads):
+            index = SpellIndex(index_dir)
+        load_ms = (time.perf_counter() - start) / args.loads * 1000
+
+        print(f"index: {size_mb:.1f} MB, built once in {build_s:.2f}s, memory-mapped load {load_ms:.2f} ms")
+        print(f"{args.tokens} tokens ({len(unique)} distinct), {args.error_rate:.0%} with typos")
+        print(f"{'lookup':<34} {'tokens/sec':>12} {'accuracy':>10}")
+
+        out, elapsed = timed(lambda t: (index.lookup(t) or (t,))[0], tokens)
+        report("SpellIndex.lookup (every token)", tokens, truth, out, elapsed)
+        corrector = SpellCorrector(index)
+        out, elapsed = timed(corrector.correct_word, tokens)
+        report("SpellCorrector (memoized)", tokens, truth, out, elapsed)
+
+        if not args.no_baseline:
+            from symspellpy import SymSpell, Verbosity
+
+            start = time.perf_counter()
+            sym = SymSpell(max_dictionary_edit_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH)
+            sym.load_dictionary(dictionary, term_index=0, count_index=1)
+            print(f"\nsymspellpy in memory: dictionary rebuilt in {time.perf_counter() - start:.2f}s per launch")
+
+            def lookup(token):
+                hits = sym.lookup(token, Verbosity.TOP, max_edit_distance=MAX_EDIT_DISTANCE)
+                return hits[0].term if hits else token
+
+            out, elapsed = timed(lookup, tokens)
+            report("symspellpy lookup (every token)", tokens, truth, out, elapsed)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+
+# Measured from interpreter start of this script, before any app module is imported
+T0 = time.perf_counter()
+
+import cv2
+import numpy as np
+
+
+def synthetic_page():
+    page = np.full((1100, 850, 3), 245, dtype=np.uint8)
+    for i, line in enumerate(["DOCSEE STARTUP BENCHMARK", "Time to first OCR result", "Page 1 of 1"]):
+        cv2.putText(page, line, (60, 150 + i * 90), cv2.FONT_HERSHEY_SIMPLEX, 1.4, (20, 20, 20), 3)
+    return page
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure DOCSee time-to-splash and time-to-first-OCR.")
+    parser.add_argument("--max-splash-ms", type=float, default=None,
+                        help="Fail (exit 1) if the splash takes longer than this")
+    parser.add_argument("--max-first-ocr-s", type=float, default=None,
+                        help="Fail (exit 1) if the first OCR result takes longer than this")
+    args = parser.parse_args(argv)
+
+    # splash.png / icon.ico are loaded relative to the working directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+
+    from main_window import MainWindow
+    from ocr_pipeline import run_ocr
+    from reader_provider import get_reader_provider
+
+    window = MainWindow()
+    app.processEvents()  # first paint of the splash
+    splash_ms = (time.perf_counter() - T0) * 1000
+    print(f"time-to-splash:    {splash_ms:8.1f} ms")
+
+    # Same path the GUI takes: wait for the background warm-up, then OCR one page
+    reader = get_reader_provider().get()
+    ready_s = time.perf_counter() - T0
+    results = run_ocr(synthetic_page(), reader)
+    first_ocr_s = time.perf_counter() - T0
+
+    print(f"reader ready:      {ready_s:8.2f} s  (device: {get_reader_provider().device})")
+    print(f"time-to-first-OCR: {first_ocr_s:8.2f} s  ({len(results)} lines)")
+    window.close()
+
+    failed = False
+    if args.max_splash_ms is not None and splash_ms > args.max_splash_ms:
+        print(f"REGRESSION: splash {splash_ms:.1f} ms > {args.max_splash_ms} ms")
+        failed = True
+    if args.max_first_ocr_s is not None and first_ocr_s > args.max_first_ocr_s:
+        print(f"REGRESSION: first OCR {first_ocr_s:.2f} s > {args.max_first_ocr_s} s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
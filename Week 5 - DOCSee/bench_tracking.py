@@ -0,0 +1,102 @@
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from bench_detect import corner_error, synthetic_photo
+from doc_tracker import CANNY_THRESHOLDS, CornerTracker, StabilityCounter, detect_quad
+
+
+def legacy_corners(gray):
+    # WebcamWindow.update_frame before tracking: a full pass on every frame,
+    # corners in whatever order approxPolyDP returned them
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    edged = cv2.Canny(blurred, *CANNY_THRESHOLDS)
+    contours, _ = cv2.findContours(edged.copy(), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    contours = sorted(contours, key=cv2.contourArea, reverse=True)[:5]
+    for contour in contours:
+        peri = cv2.arcLength(contour, True)
+        approx = cv2.approxPolyDP(contour, 0.02 * peri, True)
+        if len(approx) == 4:
+            return approx.reshape(4, 2).astype(np.float32)
+    return None
+
+
+class DetectEveryFrame:
+    def __init__(self, func):
+        self.func = func
+
+    def update(self, gray):
+        return self.func(gray)
+
+
+def clip(width, height, moving, holding, rng):
+    # A page slid into view over `moving` frames, then held by hand (sub-pixel
+    # to pixel tremor) for `holding` frames; fresh sensor noise every frame.
+    # Yields (gray frame, true corners).
+    pad = 200
+    page, corners = synthetic_photo(width, height, rng)
+    desk = cv2.cvtColor(page[:1, :1], cv2.COLOR_BGR2GRAY)[0, 0]
+    scene = cv2.copyMakeBorder(cv2.cvtColor(page, cv2.COLOR_BGR2GRAY), pad, pad, pad, pad,
+                               cv2.BORDER_CONSTANT, value=int(desk)).astype(np.int16)
+    corners = corners + pad
+    for n in range(moving + holding):
+        if n < moving:
+            x, y = -pad * (1 - n / moving), -pad * (1 - n / moving) * 0.5
+        else:
+            x, y = rng.normal(0, 0.7, size=2)
+        x0, y0 = pad + x, pad + y
+        M = np.float32([[1, 0, -x0], [0, 1, -y0]])
+        frame = cv2.warpAffine(scene, M, (width, height), flags=cv2.INTER_LINEAR)
+        frame = frame + rng.integers(-6, 7, size=frame.shape, dtype=np.int16)
+        yield np.clip(frame, 0, 255).astype(np.uint8), corners - (x0, y0)
+
+
+def run(finder, frames):
+    stability = StabilityCounter()
+    times, tracked, capture = [], [], None
+    for n, (gray, truth) in enumerate(frames):
+        start = time.perf_counter()
+        corners = finder.update(gray)
+        times.append((time.perf_counter() - start) * 1000)
+        tracked.append(getattr(finder, "mode", None) == "track")
+        if stability.update(corners) and capture is None:
+            capture = (n, corner_error(corners, truth))
+    return np.array(times), np.array(tracked), capture
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Webcam corner finding: detect every frame vs detect-then-track.")
+    parser.add_argument("--width", type=int, default=720, help="Frame width (a 1280x720 webcam, rotated)")
+    parser.add_argument("--height", type=int, default=1280)
+    parser.add_argument("--moving", type=int, default=30, help="Frames while the page slides into view")
+    parser.add_argument("--holding", type=int, default=120, help="Frames while it is held still")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    methods = [
+        ("detect every frame (before)", lambda: DetectEveryFrame(legacy_corners)),
+        ("detect every frame, ordered", lambda: DetectEveryFrame(detect_quad)),
+        ("detect then track", CornerTracker),
+    ]
+    print(f"{args.width}x{args.height}, {args.moving} moving + {args.holding} held frames")
+    print(f"{'method':<30} {'ms/frame':>9} {'p95 ms':>7} {'capture frame':>14} {'held frames':>12} {'err px':>7}")
+    for name, make in methods:
+        finder = make()
+        frames = clip(args.width, args.height, args.moving, args.holding, np.random.default_rng(args.seed))
+        times, tracked, capture = run(finder, frames)
+        if capture is None:
+            at, held, err = "never", "-", "-"
+        else:
+            at, held, err = capture[0], max(0, capture[0] - args.moving + 1), f"{capture[1].max():.2f}"
+        print(f"{name:<30} {times.mean():9.2f} {np.percentile(times, 95):7.2f} {at:>14} {held:>12} {err:>7}")
+        if tracked.any():
+            print(f"{'  tracked frames only':<30} {times[tracked].mean():9.2f} "
+                  f"{np.percentile(times[tracked], 95):7.2f}   ({tracked.sum()} of {len(times)} frames)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
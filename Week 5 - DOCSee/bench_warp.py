@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from bench_detect import synthetic_photo
+from geometry import FrameWarper, PageWarp, four_point_transform, warp_document
+
+# Photos are warped once each, so the page figure is plain throughput, with
+# nothing to compare it against. Webcam frames under unchanged corners are
+# where caching pays: FrameWarper against a fresh warp per frame. Methods
+# are timed in alternating rounds and the median round is reported, so a
+# noisy machine slows all of them alike.
+
+
+def timed(funcs, repeats):
+    # Median seconds per call of each function, over `repeats` alternating rounds
+    for func in funcs:
+        func()  # warm-up
+    rounds = [[] for _ in funcs]
+    for _ in range(repeats):
+        for times, func in zip(rounds, funcs):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    return [float(np.median(times)) for times in rounds]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perspective warp throughput: pages/sec and frames/sec.")
+    parser.add_argument("--pages", type=int, default=8, help="Photos per batch")
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--frames", type=int, default=30, help="Webcam frames per timed round")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed rounds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"\n{args.pages} photos of {args.width}x{args.height}, warped one by one as on upload")
+    photos = [synthetic_photo(args.width, args.height, rng) for _ in range(args.pages)]
+    [seconds] = timed([lambda: [warp_document(p, c) for p, c in photos]], args.repeats)
+    print(f"{seconds * 1000:.1f} ms/batch, {args.pages / seconds:.1f} pages/s")
+
+    print(f"\n{args.frames} webcam frames of 1280x720 per round, corners unchanged")
+    frame, corners = synthetic_photo(1280, 720, rng)
+    warp = PageWarp(corners)
+    out = np.empty((warp.size[1], warp.size[0], 3), dtype=np.uint8)
+    warper = FrameWarper()
+    streams = [
+        ("per call (before)", lambda: four_point_transform(frame, corners)),
+        ("FrameWarper (remap maps)", lambda: warper(frame, corners)),
+        ("FrameWarper, reused output", lambda: warper(frame, corners, out)),
+    ]
+    results = timed([lambda func=func: [func() for _ in range(args.frames)] for _, func in streams], args.repeats)
+    print(f"{'method':<28} {'ms/frame':>9} {'frames/s':>9}")
+    for (name, _), seconds in zip(streams, results):
+        seconds /= args.frames
+        print(f"{name:<28} {seconds * 1000:9.2f} {1 / seconds:9.1f}")
+    print(f"FrameWarper rebuilt its maps {warper.rebuilds} time(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from bench_export import WORDS
+from frame_source import SEQUENCE_FPS, open_source
+from webcam_pipeline import WebcamPipeline
+
+# Headless webcam scanning: each clip is replayed in real time through the
+# same pipeline WebcamWindow runs (capture thread, detection thread) in
+# continuous mode, without any Qt. Given no clips, a few synthetic scanning
+# clips are recorded first. A clip may come with <clip>.json holding
+# {"fps": ..., "settled": [frame where each page comes to rest, ...]}, which
+# adds the delay from a page settling to its capture.
+
+FRAME_SIZE = (720, 1280)  # a 1280x720 webcam, already rotated upright
+DESK = 90
+
+
+def text_page(rng, width=600, height=850):
+    # A page of random words; different on every call
+    page = np.full((height, width), 235, dtype=np.uint8)
+    for y in range(70, height - 40, 34):
+        x = 40
+        while True:
+            word = str(rng.choice(WORDS))
+            (w, _), _ = cv2.getTextSize(word, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
+            if x + w > width - 40 - rng.integers(0, 200):
+                break
+            cv2.putText(page, word, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, 40, 2)
+            x += w + 14
+    return page
+
+
+def place(page, corners, rng, blur=0):
+    # The page seen by the camera at corners, with sensor noise and optional
+    # motion blur (pixels) in a random direction
+    width, height = FRAME_SIZE
+    frame = np.full((height, width), DESK, dtype=np.uint8)
+    if page is not None:
+        h, w = page.shape
+        M = cv2.getPerspectiveTransform(np.float32([[0, 0], [w, 0], [w, h], [0, h]]), np.float32(corners))
+        cv2.warpPerspective(page, M, (width, height), dst=frame, borderMode=cv2.BORDER_TRANSPARENT)
+    if blur > 1:
+        kernel = np.zeros((blur, blur), np.float32)
+        kernel[blur // 2, :] = 1
+        R = cv2.getRotationMatrix2D(((blur - 1) / 2, (blur - 1) / 2), rng.uniform(0, 180), 1)
+        kernel = cv2.warpAffine(kernel, R, (blur, blur))
+        frame = cv2.filter2D(frame, -1, kernel / kernel.sum())
+    noisy = frame.astype(np.int16) + rng.integers(-6, 7, size=frame.shape, dtype=np.int16)
+    return cv2.cvtColor(np.clip(noisy, 0, 255).astype(np.uint8), cv2.COLOR_GRAY2BGR)
+
+
+def scanning_clip(pages, rng, blur_rate=0.3):
+    # Frames of a session: each page slides in, is held by hand (tremor,
+    # some motion-blurred frames) and is then swapped for the next in place
+    # or taken away first. Returns (frames, settled frame indexes).
+    rest = np.float32([[110, 160], [610, 140], [640, 1120], [80, 1100]])
+    frames, settled = [], []
+    for n in range(pages):
+        page = text_page(rng)
+        for step in range(10):  # sliding in from the right, blurred
+            shift = (10 - step) * 45
+            frames.append(place(page, rest + (shift, 0), rng, blur=9))
+        settled.append(len(frames))
+        for _ in range(40):
+            blur = int(rng.integers(7, 21)) if rng.random() < blur_rate else 0
+            frames.append(place(page, rest + rng.normal(0, 0.7, (4, 2)), rng, blur))
+        if n % 2:
+            frames += [place(None, None, rng)] * 10  # hands empty for a moment
+    return frames, settled
+
+
+def record_clips(directory, count, pages, rng):
+    # Synthetic clips as an image sequence and as an MJPG video, alternately
+    clips = []
+    for n in range(count):
+        frames, settled = scanning_clip(pages, rng)
+        if n % 2 == 0:
+            path = os.path.join(directory, f"clip{n}")
+            os.makedirs(path)
+            for i, frame in enumerate(frames):
+                cv2.imwrite(os.path.join(path, f"{i:05d}.jpg"), frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        else:
+            path = os.path.join(directory, f"clip{n}.avi")
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), SEQUENCE_FPS, FRAME_SIZE)
+            for frame in frames:
+                writer.write(frame)
+            writer.release()
+        with open(path + ".json", "w") as f:
+            json.dump({"fps": SEQUENCE_FPS, "settled": settled}, f)
+        clips.append(path)
+    return clips
+
+
+def replay(path, speed):
+    meta = {}
+    if os.path.exists(path + ".json"):
+        with open(path + ".json") as f:
+            meta = json.load(f)
+    source = open_source(path, fps=meta.get("fps"), speed=speed)
+    if not source.isOpened():
+        raise ValueError(f"Could not open clip: {path}")
+
+    captures = []
+    pipeline = WebcamPipeline(rotate=None, continuous=True, latency_samples=None)
+    # No GUI: a preview counts as shown as soon as it is ready
+    pipeline.on_preview = lambda preview, timestamp: pipeline.frame_shown(timestamp)
+    pipeline.on_capture = lambda page, corners: captures.append(time.perf_counter())
+    start = time.perf_counter()
+    pipeline.start(source)
+    pipeline.wait()
+    elapsed = time.perf_counter() - start
+
+    stats = pipeline.stats()
+    # Each settled page is matched with the first capture after it
+    delays, remaining = [], list(captures)
+    for settled in meta.get("settled", []):
+        settled_at = start + settled / (source.fps * speed)
+        remaining = [t for t in remaining if t >= settled_at]
+        if remaining:
+            delays.append(remaining.pop(0) - settled_at)
+    return {
+        "clip": os.path.basename(path),
+        "capture_fps": source.delivered / elapsed,
+        "processed_fps": stats["processed"] / elapsed,
+        "detections_per_s": pipeline.tracker.counts["detections"] / elapsed,
+        "latency": (stats["latency_p50_ms"], stats["latency_p95_ms"], stats["latency_p99_ms"]),
+        "dropped": stats["dropped"] + source.skipped,
+        "captures": len(captures),
+        "pages": len(meta.get("settled", [])) or "-",
+        "first_capture": captures[0] - start if captures else None,
+        "settle_to_capture": delays,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless webcam scanning: latency, detection rate, time to capture.")
+    parser.add_argument("clips", nargs="*", help="Video files or image directories/globs (default: synthetic clips)")
+    parser.add_argument("--synthetic", type=int, default=2, help="Synthetic clips to record when none are given")
+    parser.add_argument("--pages", type=int, default=4, help="Pages per synthetic clip")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed (1 = real time)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clips = args.clips or record_clips(tmp, args.synthetic, args.pages, np.random.default_rng(args.seed))
+        print(f"{len(clips)} clip(s), {os.cpu_count()} CPU(s), replay speed {args.speed:g}x")
+        print(f"{'clip':<12} {'frames/s':>8} {'proc/s':>7} {'detect/s':>8} {'p50 ms':>7} {'p95 ms':>7} "
+              f"{'p99 ms':>7} {'dropped':>7} {'pages':>7} {'first s':>8} {'settle->capture s':>18}")
+        for path in clips:
+            r = replay(path, args.speed)
+            first = f"{r['first_capture']:8.2f}" if r["first_capture"] is not None else f"{'-':>8}"
+            delays = r["settle_to_capture"]
+            delay = f"{np.mean(delays):.2f} (max {np.max(delays):.2f})" if delays else "-"
+            print(f"{r['clip']:<12} {r['capture_fps']:8.1f} {r['processed_fps']:7.1f} {r['detections_per_s']:8.1f} "
+                  f"{r['latency'][0]:7.1f} {r['latency'][1]:7.1f} {r['latency'][2]:7.1f} {r['dropped']:>7} "
+                  f"{r['captures']:>3}/{r['pages']:<3} {first} {delay:>18}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import threading
+import cv2
+import numpy as np
+
+from ocr_pipeline import RECOGNITION_BATCH_SIZE, detect_text, filter_results, recognize_batched, scale_results
+from ocr_preprocess import OCRPreprocessor
+
+# Re-crops covering less than this share of the previous crop run full OCR again
+MIN_OVERLAP = 0.6
+# A box whose corners all shift by the same amount (within this many pixels)
+# only moved rigidly with the page, so its recognized text is reused as is
+RIGID_TOLERANCE = 1.5
+# Margin grown into the old area around changed regions, so text cut by the
+# old crop border is re-detected as a whole line
+REDETECT_MARGIN = 24
+# Changed areas are gathered on a grid of this many pixels into rectangles
+REGION_TILE = 64
+# Past this share of the page, one full detection beats many partial ones
+MAX_REDETECT_SHARE = 0.7
+
+
+class DetectionCache:
+    # Per-page record of the last OCR pass: the homography from the original
+    # image to the page EasyOCR saw (crop plus governor scale), that page's
+    # size and its raw (unfiltered) EasyOCR boxes.
+
+    def __init__(self, min_overlap=MIN_OVERLAP):
+        self.min_overlap = min_overlap
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def remember(self, index, homography, size, raw_results):
+        with self._lock:
+            self._entries[index] = (np.asarray(homography, dtype=np.float64), size, raw_results)
+
+    def get(self, index):
+        with self._lock:
+            return self._entries.get(index)
+
+    def plan(self, index, homography, size):
+        # Decide how much of the previous pass survives a re-crop. Returns
+        # (kept, moved, regions) or None when the crops barely overlap:
+        #   kept    - results whose boxes only translated, already mapped
+        #   moved   - 4-point boxes that need recognition again
+        #   regions - (x, y, w, h) areas of the new crop that need detection
+        entry = self.get(index)
+        if entry is None or homography is None:
+            return None
+        old_M, (old_w, old_h), raw_results = entry
+
+        # Maps old-crop coordinates straight into new-crop coordinates
+        H = np.asarray(homography, dtype=np.float64) @ np.linalg.inv(old_M)
+        w, h = size
+
+        old_quad = _map(H, [[0, 0], [old_w - 1, 0], [old_w - 1, old_h - 1], [0, old_h - 1]])
+        new_rect = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]], dtype=np.float32)
+        inter_area, _ = cv2.intersectConvexConvex(old_quad, new_rect)
+        if inter_area < self.min_overlap * w * h:
+            return None
+
+        changed = np.full((h, w), 255, dtype=np.uint8)
+        cv2.fillConvexPoly(changed, np.round(old_quad).astype(np.int32), 0)
+
+        kept, moved, dropped = [], [], []
+        for box, text, conf in raw_results:
+            src = np.asarray(box, dtype=np.float32)
+            mapped = _map(H, src)
+            if mapped[:, 0].min() < 0 or mapped[:, 1].min() < 0 or \
+                    mapped[:, 0].max() > w - 1 or mapped[:, 1].max() > h - 1:
+                dropped.append(mapped)  # cut by the new border; detect that area again
+                continue
+
+            shift = mapped - src
+            if np.abs(shift - shift.mean(axis=0)).max() <= RIGID_TOLERANCE:
+                kept.append(([[int(round(x)), int(round(y))] for x, y in mapped], text, conf))
+            else:
+                moved.append([[int(round(x)), int(round(y))] for x, y in mapped])
+
+        for quad in dropped:
+            cv2.fillConvexPoly(changed, np.round(quad).astype(np.int32), 255)
+
+        kernel = np.ones((2 * REDETECT_MARGIN + 1, 2 * REDETECT_MARGIN + 1), dtype=np.uint8)
+        regions = _changed_regions(cv2.dilate(changed, kernel))
+        if sum(rw * rh for _, _, rw, rh in regions) > MAX_REDETECT_SHARE * w * h:
+            return None
+        return kept, moved, regions
+
+
+def _changed_regions(mask):
+    # Cover the changed pixels with a few rectangles: mark grid tiles that
+    # contain changes, join marked tiles into runs along each tile row, then
+    # stack identical runs from consecutive rows
+    h, w = mask.shape
+    rows = -(-h // REGION_TILE)
+    cols = -(-w // REGION_TILE)
+    padded = np.zeros((rows * REGION_TILE, cols * REGION_TILE), dtype=np.uint8)
+    padded[:h, :w] = mask
+    tiles = padded.reshape(rows, REGION_TILE, cols, REGION_TILE).max(axis=(1, 3)) > 0
+
+    open_runs = {}  # (first col, last col) -> first row
+    rects = []
+    for r in range(rows + 1):
+        runs = set()
+        if r < rows:
+            c = 0
+            while c < cols:
+                if tiles[r, c]:
+                    start = c
+                    while c < cols and tiles[r, c]:
+                        c += 1
+                    runs.add((start, c))
+                else:
+                    c += 1
+        for run in list(open_runs):
+            if run not in runs:
+                rects.append((run, open_runs.pop(run), r))
+        for run in runs:
+            open_runs.setdefault(run, r)
+
+    regions = []
+    for (c0, c1), r0, r1 in rects:
+        x, y = c0 * REGION_TILE, r0 * REGION_TILE
+        regions.append((x, y, min(c1 * REGION_TILE, w) - x, min(r1 * REGION_TILE, h) - y))
+    return regions
+
+
+def _map(H, points):
+    pts = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+    return cv2.perspectiveTransform(pts, H).reshape(-1, 2)
+
+
+def _inside_any(box, rects):
+    xs = [p[0] for p in box]
+    ys = [p[1] for p in box]
+    cx = (min(xs) + max(xs)) / 2
+    cy = (min(ys) + max(ys)) / 2
+    return any(x0 <= cx <= x1 and y0 <= cy <= y1 for x0, y0, x1, y1 in rects)
+
+
+def _bounds(box):
+    xs = [p[0] for p in box]
+    ys = [p[1] for p in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def run_ocr_with_reuse(jobs, reader, detections, batch_size=RECOGNITION_BATCH_SIZE, preprocessor=None,
+                       on_lines=None):
+    # jobs: list of (index, image, homography). Pages with a usable previous
+    # pass only detect their changed regions and only recognize boxes that did
+    # not move rigidly; all recognition still shares the cross-page batches.
+    # on_lines(position, lines) streams filtered lines of jobs[position]:
+    # reused lines right away, recognized ones batch by batch.
+    preprocessor = preprocessor or OCRPreprocessor()
+    pages = []
+    reused = []
+    scales = []
+    homographies = []
+    for slot, (index, image, homography) in enumerate(jobs):
+        gray, scale = preprocessor(image, slot)
+        if homography is not None:
+            # Work in the governor-scaled page's coordinates throughout
+            homography = np.diag([scale, scale, 1.0]) @ np.asarray(homography, dtype=np.float64)
+        scales.append(scale)
+        homographies.append(homography)
+
+        size = (gray.shape[1], gray.shape[0])
+        plan = detections.plan(index, homography, size)
+
+        if plan is None:
+            horizontal_list, free_list = detect_text(gray, reader)
+            pages.append((gray, horizontal_list, free_list))
+            reused.append([])
+            continue
+
+        kept, moved, regions = plan
+        known = [_bounds(box) for box, _, _ in kept] + [_bounds(box) for box in moved]
+        horizontal_list, free_list = [], list(moved)
+        for x, y, rw, rh in regions:
+            region_h, region_f = detect_text(gray[y:y + rh, x:x + rw], reader)
+            for x_min, x_max, y_min, y_max in region_h:
+                box = [x_min + x, x_max + x, y_min + y, y_max + y]
+                if not _inside_any([[box[0], box[2]], [box[1], box[3]]], known):
+                    horizontal_list.append(box)
+            for quad in region_f:
+                box = [[px + x, py + y] for px, py in quad]
+                if not _inside_any(box, known):
+                    free_list.append(box)
+
+        pages.append((gray, horizontal_list, free_list))
+        reused.append(kept)
+
+    def stream(page_no, lines):
+        lines = filter_results(scale_results(lines, scales[page_no]))
+        if lines:
+            on_lines(page_no, lines)
+
+    if on_lines is not None:
+        for page_no, kept in enumerate(reused):
+            if kept:
+                stream(page_no, kept)
+
+    recognized = recognize_batched(reader, pages, batch_size, stream if on_lines else None)
+
+    results = []
+    for (index, _, _), homography, scale, (gray, _, _), kept, page_results in \
+            zip(jobs, homographies, scales, pages, reused, recognized):
+        raw = sorted(kept + page_results, key=lambda r: (r[0][0][1], r[0][0][0]))
+        if homography is not None:
+            detections.remember(index, homography, (gray.shape[1], gray.shape[0]), raw)
+        results.append(filter_results(scale_results(raw, scale)))
+    return results
@@ -0,0 +1,189 @@
+from collections import deque
+
+import cv2
+import numpy as np
+
+from geometry import order_points
+
+# Webcam document corners: detect, then track. The full edge/contour pass
+# runs until it finds a confident outline (convex, a sizeable part of the
+# frame); from then on the four corners are followed with pyramidal
+# Lucas-Kanade optical flow, which costs a fraction of a full pass. Detection
+# reruns every DETECT_EVERY frames to catch drift, and at once whenever a
+# corner fails the forward-backward check or the tracked outline stops
+# looking like a page.
+
+CANNY_THRESHOLDS = (50, 150)
+DETECT_EVERY = 15         # frames between full detections while tracking
+MIN_AREA_FRACTION = 0.05  # smaller outlines are shown but not tracked
+LK_WINDOW = (21, 21)
+LK_LEVELS = 2
+TRACK_RADIUS = 64         # pixels around a corner searched for it in the next frame
+LK_CRITERIA = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+FB_MAX_ERROR = 1.0        # pixels a corner may miss by when tracked forward then back
+STABLE_DISTANCE = 25      # mean corner movement (pixels) between frames that still counts as still
+STABLE_FRAMES = 6         # consecutive still frames before the page is captured
+SHARPNESS_SIZE = 256      # longest side of the page region the sharpness is measured on
+SHARPNESS_INSET = 0.15    # part of the page's bounding box trimmed off each side (page edges, desk)
+SHARPNESS_RATIO = 0.6     # share of the page's best sharpness a frame needs to count
+
+
+def detect_quad(gray):
+    # Largest four-sided outline in a grayscale frame, as 4x2 float32 corners
+    # (top-left, top-right, bottom-right, bottom-left), or None
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    edged = cv2.Canny(blurred, *CANNY_THRESHOLDS)
+    contours, _ = cv2.findContours(edged, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    contours = sorted(contours, key=cv2.contourArea, reverse=True)[:5]
+    for contour in contours:
+        peri = cv2.arcLength(contour, True)
+        approx = cv2.approxPolyDP(contour, 0.02 * peri, True)
+        if len(approx) == 4:
+            return order_points(approx)
+    return None
+
+
+def plausible_quad(corners, frame_shape):
+    # Convex and big enough to be the page, not some other rectangle in view
+    quad = corners.reshape(-1, 1, 2)
+    min_area = MIN_AREA_FRACTION * frame_shape[0] * frame_shape[1]
+    return bool(cv2.isContourConvex(quad)) and cv2.contourArea(quad) >= min_area
+
+
+class CornerTracker:
+    # Call update(gray) once per frame; it returns the document corners (as
+    # detect_quad does) or None. mode tells how they were found: "detect",
+    # "track" or None; counts keeps running totals for benchmarks.
+
+    def __init__(self, detect_every=DETECT_EVERY, fb_max_error=FB_MAX_ERROR):
+        self.detect_every = detect_every
+        self.fb_max_error = fb_max_error
+        self.counts = dict.fromkeys(("detections", "tracked", "lost"), 0)
+        self.reset()
+
+    def reset(self):
+        # Forget the document, e.g. when the camera is reopened
+        self.corners = None
+        self.mode = None
+        self._prev_gray = None
+        self._since_detect = 0
+
+    def update(self, gray):
+        tracked = None
+        if self._prev_gray is not None:
+            tracked = self._track(gray)
+            if tracked is None:
+                self.counts["lost"] += 1
+
+        if tracked is not None and self._since_detect < self.detect_every:
+            self._since_detect += 1
+            self.counts["tracked"] += 1
+            corners, self.mode = tracked, "track"
+        else:
+            corners, self.mode = self._detect(gray, tracked)
+
+        # Only a confident outline is worth following into the next frame
+        self._prev_gray = gray if corners is not None and plausible_quad(corners, gray.shape) else None
+        self.corners = corners
+        return corners
+
+    def _detect(self, gray, tracked):
+        self._since_detect = 0
+        self.counts["detections"] += 1
+        found = detect_quad(gray)
+        if found is not None and (tracked is None or plausible_quad(found, gray.shape)):
+            return found, "detect"  # also corrects whatever the track drifted
+        if tracked is not None:
+            return tracked, "track"  # detection missed the page; the tracker did not
+        return None, None
+
+    def _track(self, gray):
+        # Each corner is tracked within a patch around it, so the image
+        # pyramids cover a few patches instead of two whole frames
+        h, w = gray.shape
+        corners = np.empty((4, 2), dtype=np.float32)
+        params = dict(winSize=LK_WINDOW, maxLevel=LK_LEVELS, criteria=LK_CRITERIA)
+        for i, (x, y) in enumerate(self.corners):
+            x0, y0 = max(0, int(x) - TRACK_RADIUS), max(0, int(y) - TRACK_RADIUS)
+            x1, y1 = min(w, int(x) + TRACK_RADIUS + 1), min(h, int(y) + TRACK_RADIUS + 1)
+            if x1 <= x0 or y1 <= y0:
+                return None
+            prev_patch, patch = self._prev_gray[y0:y1, x0:x1], gray[y0:y1, x0:x1]
+            prev = np.float32([[[x - x0, y - y0]]])
+            nxt, status, _ = cv2.calcOpticalFlowPyrLK(prev_patch, patch, prev, None, **params)
+            back, status_back, _ = cv2.calcOpticalFlowPyrLK(patch, prev_patch, nxt, None, **params)
+            if not (status[0, 0] and status_back[0, 0]) or np.linalg.norm(back - prev) > self.fb_max_error:
+                return None
+            corners[i] = nxt[0, 0] + (x0, y0)
+        return corners if plausible_quad(corners, gray.shape) else None
+
+
+class StabilityCounter:
+    # Counts consecutive frames whose corners moved less than STABLE_DISTANCE
+    # on average; update() returns True once the page has held still for
+    # STABLE_FRAMES of them.
+
+    def __init__(self, distance=STABLE_DISTANCE, frames=STABLE_FRAMES):
+        self.distance = distance
+        self.frames = frames
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.last = None
+
+    def update(self, corners):
+        if corners is None:
+            self.reset()
+            return False
+        if self.last is not None and np.linalg.norm(corners - self.last, axis=1).mean() < self.distance:
+            self.count += 1
+        else:
+            self.count = 0
+        self.last = corners
+        return self.count >= self.frames
+
+
+def sharpness(gray, corners):
+    # Variance of the Laplacian over the middle of the page, shrunk to at
+    # most SHARPNESS_SIZE: high for crisp text, low for a blurred frame
+    x, y, w, h = cv2.boundingRect(np.int32(corners))
+    x0, x1 = max(0, int(x + SHARPNESS_INSET * w)), min(gray.shape[1], int(x + (1 - SHARPNESS_INSET) * w))
+    y0, y1 = max(0, int(y + SHARPNESS_INSET * h)), min(gray.shape[0], int(y + (1 - SHARPNESS_INSET) * h))
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return 0.0
+    region = gray[y0:y1, x0:x1]
+    scale = min(1.0, SHARPNESS_SIZE / max(region.shape))
+    if scale < 1.0:
+        region = cv2.resize(region, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    _, std = cv2.meanStdDev(cv2.Laplacian(region, cv2.CV_16S))
+    return float(std[0, 0]) ** 2
+
+
+class SharpFrames:
+    # The frames of the current still run with their sharpness, so the
+    # capture can use the sharpest instead of the last. How sharp a page can
+    # get depends on how much text it has, so the minimum a frame must reach
+    # is relative: SHARPNESS_RATIO of the best score seen for this page.
+
+    def __init__(self, length=STABLE_FRAMES + 1, ratio=SHARPNESS_RATIO):
+        self.ratio = ratio
+        self.frames = deque(maxlen=length)  # (score, frame, corners)
+        self.best = 0.0
+
+    def reset(self):
+        # New page (or none): forget its frames and best score
+        self.frames.clear()
+        self.best = 0.0
+
+    def sharp_enough(self, score):
+        self.best = max(self.best, score)
+        return score >= self.ratio * self.best
+
+    def add(self, score, frame, corners):
+        self.frames.append((score, frame, corners))
+
+    def sharpest(self):
+        # (frame, corners) of the best frame held
+        _, frame, corners = max(self.frames, key=lambda item: item[0])
+        return frame, corners
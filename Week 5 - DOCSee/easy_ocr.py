@@ -1,46 +1,287 @@
-import cv2
-import re
-from PyQt5.QtCore import QThread, pyqtSignal
+import os
+import threading
+from PyQt5.QtCore import QCoreApplication, QObject, QThread, pyqtSignal
+from PyQt5.QtWidgets import QMessageBox
 import traceback
+from detection_reuse import DetectionCache, run_ocr_with_reuse
+from enhance import parse_steps
+from ocr_pipeline import RECOGNITION_BATCH_SIZE, ocr_params, run_ocr_cached
+from ocr_preprocess import OCRPreprocessor
+from spell_correct import get_spell_corrector
+
+# Comma-separated enhance.py steps the windows run before OCR, e.g.
+# DOCSEE_ENHANCE=clahe,threshold; none by default
+ENHANCE_ENV = "DOCSEE_ENHANCE"
+
+
+def gui_preprocess_options():
+    # OCRPreprocessor settings for the schedulers of the windows
+    try:
+        enhance = parse_steps(os.environ.get(ENHANCE_ENV, ""))
+    except ValueError as e:
+        print(f"[OCRScheduler ERROR] {ENHANCE_ENV} -> {e}")
+        enhance = ()
+    return {"enhance": enhance}
+
 
 class OCRWorker(QThread):
-    result_ready = pyqtSignal(int, list)
+    # index, generation, filtered results
+    job_done = pyqtSignal(int, int, list)
+    # index, generation, filtered lines from one recognition batch
+    lines_done = pyqtSignal(int, int, list)
+    # index, generation, error message
+    failed = pyqtSignal(int, int, str)
 
-    def __init__(self, index, image, reader):
+    def __init__(self, scheduler, reader_provider):
         super().__init__()
-        self.index = index      # Index of the image
-        self.image = image      # OpenCV BGR image
-        self.reader = reader    # EasyOCR reader (shared, passed from GUI)
+        self.scheduler = scheduler              # OCRScheduler that owns the job queue
+        self.reader_provider = reader_provider  # Shared ReaderProvider (see reader_provider.py)
+        # Per-worker buffers, reused across same-sized pages
+        self.preprocessor = OCRPreprocessor(**scheduler.preprocess_options)
 
     def run(self):
-        try:
-            # Step 1: Convert to grayscale
-            gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        while True:
+            jobs, detections = self.scheduler.next_jobs()
+            if not jobs:
+                return  # scheduler shut down
+            try:
+                # Low-confidence words are spell-corrected after the cache, so
+                # cached results stay independent of the dictionary
+                corrector = get_spell_corrector() if self.scheduler.spell_check else None
+                correct = corrector or (lambda lines: lines)
+
+                # Cached pages return at once; the rest wait here (off the GUI
+                # thread) for the models. Re-cropped pages reuse their previous
+                # detection boxes, and text boxes from every page are recognized
+                # in shared batches (see detection_reuse / ocr_pipeline)
+                def run_batch(positions):
+                    reader = self.reader_provider.get()
+                    pending = [(jobs[i][0], jobs[i][2], jobs[i][3]) for i in positions]
+
+                    def stream(position, lines):
+                        index, generation = jobs[positions[position]][:2]
+                        self.lines_done.emit(index, generation, correct(lines))
+
+                    return run_ocr_with_reuse(pending, reader, detections, self.scheduler.batch_size,
+                                              self.preprocessor, stream)
+
+                images = [job[2] for job in jobs]
+                results = run_ocr_cached(images, run_batch, self.scheduler.cache, ocr_params(self.preprocessor))
+                for (index, generation, _, _), filtered in zip(jobs, results):
+                    self.job_done.emit(index, generation, correct(filtered))
+
+            except Exception as e:
+                for index, generation, _, _ in jobs:
+                    self.failed.emit(index, generation, str(e))
+                print(f"[OCRWorker ERROR] indexes={[job[0] for job in jobs]} -> {e}")
+                traceback.print_exc()
+
+
+class OCRScheduler(QObject):
+    # Final filtered results of a page
+    result_ready = pyqtSignal(int, list)
+    # Lines of a page as they are recognized, ahead of result_ready
+    lines_ready = pyqtSignal(int, list)
+    # A page whose recognition raised, with the error; it is no longer pending
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, reader_provider, cache=None, max_workers=None, batch_pages=4,
+                 batch_size=RECOGNITION_BATCH_SIZE, preprocess_options=None, spell_check=True):
+        super().__init__()
+        # All workers share one Reader, so a couple of threads is enough to
+        # overlap preprocessing with inference without thrashing the CPU
+        self.max_workers = max_workers or min(2, os.cpu_count() or 1)
+        self.batch_pages = batch_pages  # background pages recognized together; 1 = page by page
+        self.batch_size = batch_size
+        self.preprocess_options = preprocess_options or {}  # OCRPreprocessor stage settings
+        self.spell_check = spell_check  # SymSpell on low-confidence words (spell_correct.py)
+        self.reader_provider = reader_provider
+        self.cache = cache  # optional OCRCache consulted before any model call
+        self.detections = DetectionCache()  # last boxes per page, reused on re-crop
+        self.current_index = 0
+        self._pending = {}      # index -> (generation, image, homography), oldest first
+        self._latest = {}       # index -> generation whose result is still wanted
+        self._generation = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._workers = []
+
+        # A bound method, so the connection does not keep this scheduler alive
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._shutdown_at_quit)
+
+    def submit(self, index, image, homography=None):
+        # homography maps the page's original image onto this crop; when given,
+        # a later re-crop of the same page can reuse this pass's boxes
+        with self._cond:
+            self._generation += 1
+            # A newer crop of the same page replaces its queued job and
+            # invalidates any result still being computed for the old one
+            self._pending.pop(index, None)
+            self._pending[index] = (self._generation, image, homography)
+            self._latest[index] = self._generation
+            self._cond.notify()
+        self._start_workers()
+
+    def set_current_index(self, index):
+        # The page on screen is always taken next
+        with self._cond:
+            self.current_index = index
+
+    def cancel_all(self):
+        with self._cond:
+            self._pending.clear()
+            self._latest.clear()
+            # Jobs already running keep the old cache, so they cannot leak boxes
+            # from the previous upload into the new one
+            self.detections = DetectionCache()
+
+    def is_pending(self, index):
+        with self._cond:
+            return index in self._latest
+
+    def shutdown(self, wait=False):
+        with self._cond:
+            if self.cache is not None and not self._closed:
+                stats = self.cache.stats()
+                print(f"[OCRCache] hits={stats['hits']} misses={stats['misses']} "
+                      f"hit_rate={stats['hit_rate']:.0%} size={stats['bytes'] / 1e6:.1f} MB")
+            self._closed = True
+            self._pending.clear()
+            self._latest.clear()
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.wait()
+        if wait or not any(worker.isRunning() for worker in self._workers):
+            # Nothing left for the application to wait for at quit
+            app = QCoreApplication.instance()
+            if app is not None:
+                try:
+                    app.aboutToQuit.disconnect(self._shutdown_at_quit)
+                except TypeError:
+                    pass  # already disconnected
+
+    def _shutdown_at_quit(self):
+        self.shutdown(wait=True)
+
+    def next_jobs(self):
+        # Called from worker threads; blocks until there is work or shutdown.
+        # The page on screen goes first and on its own, so its lines stream
+        # without waiting for other pages' detection; otherwise the oldest
+        # queued pages are recognized together.
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return [], None
+            if self.current_index in self._pending:
+                indexes = [self.current_index]
+            else:
+                indexes = list(self._pending)[:self.batch_pages]
+            jobs = []
+            for index in indexes:
+                generation, image, homography = self._pending.pop(index)
+                jobs.append((index, generation, image, homography))
+            return jobs, self.detections
+
+    def _start_workers(self):
+        if self._closed:
+            return
+        while len(self._workers) < self.max_workers:
+            worker = OCRWorker(self, self.reader_provider)
+            worker.job_done.connect(self._deliver)
+            worker.lines_done.connect(self._deliver_lines)
+            worker.failed.connect(self._deliver_failure)
+            self._workers.append(worker)
+            worker.start()
+
+    def _deliver_lines(self, index, generation, lines):
+        with self._cond:
+            if self._latest.get(index) != generation:
+                return
+        self.lines_ready.emit(index, lines)
+
+    def _deliver(self, index, generation, result):
+        # Runs on the GUI thread; drop results from cancelled or superseded jobs
+        with self._cond:
+            if self._latest.get(index) != generation:
+                return
+            del self._latest[index]
+        self.result_ready.emit(index, result)
+
+    def _deliver_failure(self, index, generation, message):
+        # A failed job should not leave its page marked as pending forever, so
+        # the page is submitted again the next time its text is asked for
+        with self._cond:
+            if self._latest.get(index) != generation:
+                return
+            del self._latest[index]
+        self.failed.emit(index, message)
+
+
+class OCRResultsMixin:
+    # OCR results and the streaming text popup, shared by the windows. The
+    # window sets self.ocr_scheduler, self.ocr_results (index -> final
+    # lines) and self.ocr_partial (index -> lines so far), and connects the
+    # scheduler's lines_ready / result_ready to store_ocr_lines / store_ocr_result.
+
+    def start_ocr_thread(self, index, image, homography=None):
+        # Any previous result belongs to the old crop of this page
+        self.ocr_results.pop(index, None)
+        self.ocr_partial.pop(index, None)
+        self.ocr_scheduler.submit(index, image, homography)
+
+    def store_ocr_lines(self, index, lines):
+        self.ocr_partial.setdefault(index, []).extend(lines)
+
+    def store_ocr_result(self, index, result):
+        self.ocr_partial.pop(index, None)
+        self.ocr_results[index] = result
 
-            # Step 2: Apply sharpening to emphasize text
-            sharpened = cv2.addWeighted(gray, 1.5, cv2.GaussianBlur(gray, (0, 0), 1), -0.5, 0)
+    def store_ocr_failure(self, index, message):
+        # Nothing is kept; opening the text again submits the page anew
+        self.ocr_partial.pop(index, None)
 
-            # Step 3: Convert to RGB for EasyOCR
-            processed = cv2.cvtColor(sharpened, cv2.COLOR_GRAY2RGB)
+    def stream_ocr_text(self, dialog, text_edit, index):
+        # Show lines in reading order as they arrive; the text becomes editable
+        # once the whole page is done, so edits are not overwritten
+        dialog.setWindowTitle("OCR Result (recognizing...)")
+        text_edit.setReadOnly(True)
 
-            # Step 4: Run EasyOCR
-            results = self.reader.readtext(processed)
+        def show(lines):
+            lines = sorted(lines, key=lambda line: (line[0][0][1], line[0][0][0]))
+            text_edit.setPlainText("\n".join([str(line[1]) for line in lines]))
 
-            # Step 5: Filter by confidence and keep valid formats
-            filtered = []
-            for res in results:
-                text = res[1].strip()
-                conf = res[2]
+        def on_lines(line_index, _):
+            if line_index == index:
+                show(self.ocr_partial.get(index, []))
 
-                if conf < 0.4 or len(text) < 2:
-                    continue  # skip low confidence or meaningless short text
+        def on_result(result_index, result):
+            if result_index == index:
+                disconnect()
+                show(result)
+                text_edit.setReadOnly(False)
+                dialog.setWindowTitle("OCR Result")
 
-                if re.match(r'^[-•*]?\s*[A-Z0-9][\w\s.,:;()\-+*/=%&!?"\']+$', text):
-                    filtered.append(res)
+        def on_failed(failed_index, message):
+            if failed_index == index:
+                disconnect()
+                text_edit.setReadOnly(False)
+                dialog.setWindowTitle("OCR Result (failed)")
+                QMessageBox.critical(dialog, "OCR Error", f"Text recognition failed:\n{message}")
 
-            # Step 6: Emit result
-            self.result_ready.emit(self.index, filtered)
+        def disconnect():
+            try:
+                self.ocr_scheduler.lines_ready.disconnect(on_lines)
+                self.ocr_scheduler.result_ready.disconnect(on_result)
+                self.ocr_scheduler.failed.disconnect(on_failed)
+            except TypeError:
+                pass  # already disconnected when the result arrived
 
-        except Exception as e:
-            print(f"[OCRWorker ERROR] index={self.index} -> {e}")
-            traceback.print_exc()
+        show(self.ocr_partial.get(index, []))
+        self.ocr_scheduler.lines_ready.connect(on_lines)
+        self.ocr_scheduler.result_ready.connect(on_result)
+        self.ocr_scheduler.failed.connect(on_failed)
+        dialog.finished.connect(disconnect)
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# Page enhancement between warp and OCR: CLAHE -> adaptive threshold ->
+# morphological clean-up, each step optional. Pages larger than one tile are
+# cut into tiles and processed on a thread pool (OpenCV releases the GIL).
+# Every tile is read with a halo as wide as its step's neighbourhood, so the
+# tiled result is pixel-identical to processing the page in one piece.
+
+STEPS = ("clahe", "threshold", "denoise")  # always applied in this order
+BILEVEL_STEPS = STEPS  # black-and-white page for bilevel PDF export
+
+CLAHE_CLIP_LIMIT = 2.0
+CLAHE_CELL = 64        # pixels per side of one CLAHE histogram cell
+THRESHOLD_BLOCK = 31   # adaptive threshold neighbourhood, odd
+THRESHOLD_C = 15       # how much darker than its neighbourhood ink must be
+DENOISE_KERNEL = 3     # specks and pinholes smaller than this are removed
+TILE_SIZE = 1024       # multiple of CLAHE_CELL; halos cost time, so one CPU gets no tiles
+
+
+def parse_steps(text):
+    # "clahe,threshold" (--enhance, DOCSEE_ENHANCE) -> ("clahe", "threshold")
+    steps = tuple(step.strip() for step in text.split(",") if step.strip())
+    unknown = set(steps) - set(STEPS)
+    if unknown:
+        raise ValueError(f"Unknown enhancement step(s): {', '.join(sorted(unknown))}")
+    return steps
+
+
+class PageEnhancer:
+    # Grayscale or BGR page in, enhanced single-channel page of the same size
+    # out. After each call, timings holds milliseconds per step and "total".
+
+    def __init__(self, steps=STEPS, clip_limit=CLAHE_CLIP_LIMIT, cell=CLAHE_CELL,
+                 block=THRESHOLD_BLOCK, c=THRESHOLD_C, kernel=DENOISE_KERNEL,
+                 tile_size=None, executor=None):
+        unknown = set(steps) - set(STEPS)
+        if unknown:
+            raise ValueError(f"Unknown enhancement step(s): {', '.join(sorted(unknown))}")
+        if tile_size is None and (os.cpu_count() or 1) > 1:
+            tile_size = TILE_SIZE
+        if block % 2 == 0 or (tile_size is not None and tile_size % cell):
+            raise ValueError("block must be odd and tile_size a multiple of cell")
+        self.steps = tuple(step for step in STEPS if step in steps)
+        self.clip_limit = clip_limit
+        self.cell = cell
+        self.block = block
+        self.c = c
+        self.kernel = kernel
+        self.tile_size = tile_size  # None or 0: whole page at once
+        self.executor = executor  # defaults to the shared tile pool
+        self.timings = {}
+
+    @property
+    def bilevel(self):
+        return "threshold" in self.steps
+
+    def params(self):
+        # Everything that changes the output pixels; tiling does not
+        return {
+            "steps": list(self.steps),
+            "clip_limit": self.clip_limit,
+            "cell": self.cell,
+            "block": self.block,
+            "c": self.c,
+            "kernel": self.kernel,
+        }
+
+    def __call__(self, image):
+        start = time.perf_counter()
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        timings = {}
+        for step in self.steps:
+            step_start = time.perf_counter()
+            halo, func = self._step(step)
+            gray = self._tiled(gray, halo, func)
+            timings[step] = (time.perf_counter() - step_start) * 1000
+        timings["total"] = (time.perf_counter() - start) * 1000
+        self.timings = timings
+        return gray
+
+    def _step(self, step):
+        # (halo in pixels, function of one region)
+        if step == "clahe":
+            # Halo of one whole cell, and cell-aligned, so every interior
+            # pixel sees the same four cell histograms as on the whole page
+            return self.cell, self._clahe
+        if step == "threshold":
+            return self.block // 2, self._threshold
+        return 4 * (self.kernel // 2), self._denoise  # close + open: 4 passes
+
+    def _tiled(self, src, halo, func):
+        h, w = src.shape
+        t = self.tile_size
+        if not t or (h <= t and w <= t):
+            return func(src)
+
+        dst = np.empty_like(src)
+
+        def work(tile):
+            y0, x0 = tile
+            y1, x1 = min(y0 + t, h), min(x0 + t, w)
+            ry0, rx0 = max(0, y0 - halo), max(0, x0 - halo)
+            ry1, rx1 = min(h, y1 + halo), min(w, x1 + halo)
+            out = func(src[ry0:ry1, rx0:rx1])
+            dst[y0:y1, x0:x1] = out[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+
+        tiles = [(y, x) for y in range(0, h, t) for x in range(0, w, t)]
+        list((self.executor or get_tile_pool()).map(work, tiles))
+        return dst
+
+    def _clahe(self, region):
+        # Padded (as OpenCV pads the whole page) to whole cells, so the grid
+        # is cell-sized everywhere
+        h, w = region.shape
+        pad_y, pad_x = -h % self.cell, -w % self.cell
+        if pad_y or pad_x:
+            region = cv2.copyMakeBorder(region, 0, pad_y, 0, pad_x, cv2.BORDER_REFLECT_101)
+        grid = (region.shape[1] // self.cell, region.shape[0] // self.cell)
+        out = cv2.createCLAHE(clipLimit=self.clip_limit, tileGridSize=grid).apply(region)
+        return out[:h, :w]
+
+    def _threshold(self, region):
+        return cv2.adaptiveThreshold(region, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY,
+                                     self.block, self.c)
+
+    def _denoise(self, region):
+        # Closing removes dark specks from the paper, opening then removes
+        # light pinholes from the ink
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (self.kernel, self.kernel))
+        out = cv2.morphologyEx(region, cv2.MORPH_CLOSE, kernel)
+        return cv2.morphologyEx(out, cv2.MORPH_OPEN, kernel)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_tile_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="enhance")
+        return _pool
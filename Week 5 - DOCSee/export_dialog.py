@@ -0,0 +1,80 @@
+import os
+from datetime import datetime
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+
+from enhance import BILEVEL_STEPS, PageEnhancer
+from ocr_export import ExportCancelled, write_alto, write_hocr
+from pdf_export import write_pdf
+
+# "Save as PDF" for both windows. The file type picked in the save dialog
+# chooses the output; every format is built from pixels and OCR results the
+# window already holds, so exporting never runs the OCR model.
+
+SEARCHABLE_PDF = "Searchable PDF (*.pdf)"
+BILEVEL_PDF = "Black & white searchable PDF (*.pdf)"
+IMAGE_PDF = "Image-only PDF (*.pdf)"
+HOCR = "hOCR (*.hocr)"
+ALTO = "ALTO XML (*.xml)"
+EXPORT_FILTERS = [SEARCHABLE_PDF, BILEVEL_PDF, IMAGE_PDF, HOCR, ALTO]
+_EXTENSIONS = {SEARCHABLE_PDF: ".pdf", BILEVEL_PDF: ".pdf", IMAGE_PDF: ".pdf", HOCR: ".hocr", ALTO: ".xml"}
+
+
+def export_pages(parent, count, page_source, results_source, size_source):
+    # page_source(i): image or file path of page i (see pdf_export.write_pdf)
+    # results_source(i): its OCR results, or None when not recognized yet
+    # size_source(i): its (width, height), or None when there is no page i
+    now = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    output_path, chosen = QFileDialog.getSaveFileName(
+        parent, "Save PDF", f"scanned_{now}.pdf", ";;".join(EXPORT_FILTERS), SEARCHABLE_PDF
+    )
+    if not output_path:
+        return
+    chosen = chosen or SEARCHABLE_PDF
+    extension = _EXTENSIONS[chosen]
+    if os.path.splitext(output_path)[1].lower() != extension:
+        output_path = os.path.splitext(output_path)[0] + extension
+
+    progress = QProgressDialog("Exporting...", "Cancel", 0, count, parent)
+    progress.setWindowTitle("Save")
+    progress.setWindowModality(Qt.WindowModal)
+
+    def report(done, total):
+        progress.setValue(done)
+        return not progress.wasCanceled()
+
+    unrecognized = []
+
+    def results(i):
+        found = results_source(i)
+        if found is None:
+            unrecognized.append(i)
+        return found
+
+    def page_info(i):
+        size = size_source(i)
+        return (size[0], size[1], results(i)) if size is not None else None
+
+    try:
+        if chosen == HOCR:
+            write_hocr(output_path, count, page_info, report)
+        elif chosen == ALTO:
+            write_alto(output_path, count, page_info, report)
+        else:
+            text_source = results if chosen != IMAGE_PDF else None
+            # Enhanced to 1 bit per pixel: much smaller files for text pages
+            enhancer = PageEnhancer(BILEVEL_STEPS) if chosen == BILEVEL_PDF else None
+            write_pdf(output_path, count, page_source, report, text_source, enhancer)
+    except ExportCancelled:
+        return
+    except Exception as e:
+        QMessageBox.critical(parent, "Error", f"Failed to save:\n{str(e)}")
+        return
+    finally:
+        progress.close()
+
+    message = f"Saved:\n{output_path}"
+    if unrecognized:
+        message += f"\n\n{len(unrecognized)} page(s) had no OCR text yet and were exported without it."
+    QMessageBox.information(parent, "Success", message)
@@ -0,0 +1,144 @@
+import glob
+import os
+import time
+
+import cv2
+
+# Where webcam frames come from. Every source reads like cv2.VideoCapture
+# (read() -> (ok, frame), isOpened(), release()), so an opened camera is a
+# source as it is. Recorded clips (a video file, or a directory / glob of
+# images) are replayed at their frame rate: a frame is handed out no earlier
+# than a camera would have delivered it, and frames a slow reader missed are
+# skipped as a camera driver would, so the scanning loop sees the timing it
+# would live. Once a clip has played out, read() fails and `exhausted` is set.
+
+CAMERA_INDEX = 1  # the document camera on the machines DOCSee was built on
+SEQUENCE_FPS = 30.0
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+
+class _ReplaySource:
+    # Paces _read_next() to `fps` (scaled by speed) from the first read()
+
+    def __init__(self, fps, speed=1.0, loop=False):
+        self.fps = fps
+        self.speed = speed
+        self.loop = loop
+        self.exhausted = False
+        self.delivered = 0
+        self.skipped = 0  # frames that came due while nobody was reading
+        self._start = None
+        self._next = 0    # index of the next frame to hand out
+
+    def read(self):
+        if self.exhausted:
+            return False, None
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        due = int((now - self._start) * self.fps * self.speed)
+        while self._next < due:  # late: the camera has moved on
+            if not self._skip_next():
+                return self._end()
+            self._next += 1
+            self.skipped += 1
+
+        wait = self._start + self._next / (self.fps * self.speed) - now
+        if wait > 0:
+            time.sleep(wait)
+        frame = self._read_next()
+        if frame is None:
+            return self._end()
+        self._next += 1
+        self.delivered += 1
+        return True, frame
+
+    def isOpened(self):
+        return not self.exhausted
+
+    def release(self):
+        self.exhausted = True
+
+    def _end(self):
+        if self.loop and self._next > 0:
+            self._rewind()
+            self._start, self._next = None, 0
+            return self.read()
+        self.exhausted = True
+        return False, None
+
+    def _read_next(self):
+        raise NotImplementedError
+
+    def _skip_next(self):
+        return self._read_next() is not None
+
+    def _rewind(self):
+        raise NotImplementedError
+
+
+class VideoFileSource(_ReplaySource):
+    def __init__(self, path, fps=None, speed=1.0, loop=False):
+        self.path = path
+        self._cap = cv2.VideoCapture(path)
+        if fps is None:
+            fps = self._cap.get(cv2.CAP_PROP_FPS) or SEQUENCE_FPS
+        super().__init__(fps, speed, loop)
+        if not self._cap.isOpened():
+            self.exhausted = True
+
+    def release(self):
+        super().release()
+        self._cap.release()
+
+    def _read_next(self):
+        ok, frame = self._cap.read()
+        return frame if ok else None
+
+    def _skip_next(self):
+        return self._cap.grab()  # no decode for a frame nobody sees
+
+    def _rewind(self):
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+class ImageSequenceSource(_ReplaySource):
+    # paths: a list of image files, a directory (its images, in name order)
+    # or a glob pattern
+    def __init__(self, paths, fps=SEQUENCE_FPS, speed=1.0, loop=False):
+        if isinstance(paths, str):
+            if os.path.isdir(paths):
+                paths = [os.path.join(paths, name) for name in os.listdir(paths)
+                         if name.lower().endswith(IMAGE_EXTENSIONS)]
+            else:
+                paths = glob.glob(paths)
+            paths = sorted(paths)
+        self.paths = list(paths)
+        super().__init__(fps, speed, loop)
+        if not self.paths:
+            self.exhausted = True
+
+    def _read_next(self):
+        while self._next < len(self.paths):
+            frame = cv2.imread(self.paths[self._next])
+            if frame is not None:
+                return frame
+            print(f"[FrameSource ERROR] Could not decode frame: {self.paths[self._next]}")
+            self._next += 1
+        return None
+
+    def _skip_next(self):
+        return self._next < len(self.paths)
+
+    def _rewind(self):
+        pass  # _next going back to 0 is enough
+
+
+def open_source(spec=CAMERA_INDEX, fps=None, speed=1.0, loop=False):
+    # Camera index (int or digits), video file, image directory or glob.
+    # Check isOpened() on the result, as with cv2.VideoCapture.
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return cv2.VideoCapture(int(spec))
+    if os.path.isdir(spec) or any(char in spec for char in "*?["):
+        return ImageSequenceSource(spec, fps or SEQUENCE_FPS, speed, loop)
+    return VideoFileSource(spec, fps, speed, loop)
@@ -0,0 +1,117 @@
+import threading
+
+import cv2
+import numpy as np
+
+# Page corners -> upright page. A PageWarp derives the homography and page
+# size from its corners once and keeps them with the corners; frames that
+# show the page under the same corners reuse precomputed remap maps.
+
+# Corners that moved less than this (pixels) count as unchanged
+CORNER_TOLERANCE = 0.5
+
+
+def order_points(pts):
+    # Corners as top-left, top-right, bottom-right, bottom-left
+    pts = np.asarray(pts, dtype="float32").reshape(4, 2)
+    rect = np.zeros((4, 2), dtype="float32")
+    s = pts.sum(axis=1)
+    rect[0] = pts[np.argmin(s)]
+    rect[2] = pts[np.argmax(s)]
+
+    diff = np.diff(pts, axis=1)
+    rect[1] = pts[np.argmin(diff)]
+    rect[3] = pts[np.argmax(diff)]
+    return rect
+
+
+def perspective_transform(pts):
+    # Homography from the document corners in the source image to an upright
+    # page, plus the (width, height) of that page
+    rect = order_points(pts)
+    (tl, tr, br, bl) = rect
+
+    widthA = np.linalg.norm(br - bl)
+    widthB = np.linalg.norm(tr - tl)
+    maxWidth = int(max(widthA, widthB))
+
+    heightA = np.linalg.norm(tr - br)
+    heightB = np.linalg.norm(tl - bl)
+    maxHeight = int(max(heightA, heightB))
+
+    dst = np.array([
+        [0, 0],
+        [maxWidth - 1, 0],
+        [maxWidth - 1, maxHeight - 1],
+        [0, maxHeight - 1]], dtype="float32")
+
+    M = cv2.getPerspectiveTransform(rect, dst)
+    return M, (maxWidth, maxHeight)
+
+
+def warp_document(image, pts):
+    # Returns the upright page and the homography used to produce it
+    warp = PageWarp(pts)
+    return warp.apply(image), warp.homography
+
+
+def four_point_transform(image, pts):
+    return warp_document(image, pts)[0]
+
+
+def remap_maps(homography, size):
+    # Source coordinates of every page pixel, in the fixed-point form
+    # cv2.remap reads fastest (what warpPerspective builds on every call)
+    width, height = size
+    xs, ys = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+    grid = np.dstack([xs, ys]).reshape(1, -1, 2)
+    src = cv2.perspectiveTransform(grid, np.linalg.inv(homography)).reshape(height, width, 2)
+    return cv2.convertMaps(src, None, cv2.CV_16SC2)
+
+
+class PageWarp:
+    # Corners of one page with everything derived from them. Safe to share
+    # between threads; the remap maps are built once, on first use.
+
+    def __init__(self, corners):
+        self.corners = order_points(corners)
+        self.homography, self.size = perspective_transform(self.corners)
+        self._maps = None
+        self._lock = threading.Lock()
+
+    def same_corners(self, corners, tolerance=CORNER_TOLERANCE):
+        return float(np.abs(order_points(corners) - self.corners).max()) <= tolerance
+
+    def apply(self, image, out=None):
+        # out: optional page-sized buffer to write into instead of a new array
+        return cv2.warpPerspective(image, self.homography, self.size, dst=out)
+
+    def remap(self, image, out=None):
+        # apply() from the cached maps (equal up to fixed-point rounding);
+        # worth it once the same corners are applied to more than one frame
+        with self._lock:
+            if self._maps is None:
+                self._maps = remap_maps(self.homography, self.size)
+            map1, map2 = self._maps
+        return cv2.remap(image, map1, map2, cv2.INTER_LINEAR, dst=out)
+
+
+class FrameWarper:
+    # Warps a stream of frames (webcam) whose corners mostly stay put: the
+    # PageWarp, and with it the remap maps, is rebuilt only when they move.
+
+    def __init__(self, tolerance=CORNER_TOLERANCE):
+        self.tolerance = tolerance
+        self.warp = None
+        self.rebuilds = 0
+
+    def __call__(self, image, corners, out=None):
+        if self.warp is None or not self.warp.same_corners(corners, self.tolerance):
+            self.warp = PageWarp(corners)
+            self.rebuilds += 1
+            return self.warp.apply(image, out)  # maps only pay off on the next frame
+        return self.warp.remap(image, out)
+
+    def reset(self):
+        self.warp = None
+
@@ -0,0 +1,242 @@
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import cv2
+from PIL import Image
+
+# Decoded pages of one session under a RAM budget. Originals come back from
+# their files when evicted; crops come back by re-warping the original when
+# their homography is known, otherwise from a compressed spill file.
+
+DEFAULT_BUDGET_MB = 512
+SPILL_PNG_LEVEL = 1  # lossless, so a re-read crop hashes to the same OCR cache key
+
+ORIGINAL = "original"
+PAGE = "page"
+
+
+def _file_size(path):
+    # Size cv2.imread would decode the file to, from its headers only
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):  # rotated by 90 degrees
+                width, height = height, width
+            return width, height
+    except (OSError, SyntaxError):
+        return None
+
+
+class _Entry:
+    __slots__ = ("image", "path", "homography", "size", "spill")
+
+    def __init__(self, image=None, path=None, homography=None, size=None):
+        self.image = image            # resident pixels, or None when evicted
+        self.path = path              # source file of an original
+        self.homography = homography  # original -> page, for re-deriving a crop
+        self.size = size              # (width, height) of the page
+        self.spill = None             # compressed copy on disk
+
+
+class ImageStore:
+    # Owns the originals and crops ("pages") of an upload or webcam session,
+    # keyed by page index. Images handed out must be treated as read-only:
+    # they are shared with the store and with anyone else who asked.
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB, spill_dir=None):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self._spill_root = spill_dir
+        self._spill_dir = None
+        self._entries = {}
+        self._lru = OrderedDict()  # (index, kind) -> nbytes of resident images, oldest first
+        self._resident = 0
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ("hits", "misses", "decodes", "rederived", "spilled", "unspilled", "evictions"), 0)
+
+    # -- registering images -------------------------------------------------
+
+    def set_original(self, index, path, image=None):
+        # Original of a page backed by a file; decoded lazily unless given
+        with self._lock:
+            self._drop(index, ORIGINAL)
+            self._entries[(index, ORIGINAL)] = _Entry(path=path)
+            if image is not None:
+                self._make_resident((index, ORIGINAL), image)
+
+    def put_original(self, index, image):
+        # Original with no file behind it (e.g. a webcam frame): spilled when evicted
+        self.set_original(index, None, image)
+
+    def put_page(self, index, image, homography=None):
+        # Crop of a page; homography maps the original onto it and lets an
+        # evicted crop be re-derived instead of spilled
+        size = (image.shape[1], image.shape[0])
+        with self._lock:
+            self._drop(index, PAGE)
+            self._entries[(index, PAGE)] = _Entry(homography=homography, size=size)
+            self._make_resident((index, PAGE), image)
+
+    def remove_page(self, index):
+        with self._lock:
+            self._drop(index, PAGE)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(*key)
+            if self._spill_dir is not None:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+    # -- reading images -----------------------------------------------------
+
+    def has_page(self, index):
+        with self._lock:
+            return (index, PAGE) in self._entries
+
+    def pages(self):
+        # Indexes that have a crop, in order
+        with self._lock:
+            return sorted(index for index, kind in self._entries if kind == PAGE)
+
+    def has_original(self, index):
+        with self._lock:
+            return (index, ORIGINAL) in self._entries
+
+    def original(self, index):
+        return self._get((index, ORIGINAL))
+
+    def page(self, index):
+        return self._get((index, PAGE))
+
+    def image(self, index):
+        # What the user sees for a page: its crop if there is one, else the original
+        return self.page(index) if self.has_page(index) else self.original(index)
+
+    def size(self, index):
+        # (width, height) of image(index) without decoding it when avoidable
+        with self._lock:
+            entry = self._entries.get((index, PAGE)) or self._entries.get((index, ORIGINAL))
+            if entry is None:
+                return None
+            if entry.image is not None:
+                return entry.image.shape[1], entry.image.shape[0]
+            if entry.size is not None:
+                return entry.size
+            path = entry.path
+        if path is not None:
+            size = _file_size(path)
+            if size is not None:
+                return size
+        image = self.image(index)
+        return (image.shape[1], image.shape[0]) if image is not None else None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats.update(
+                hit_rate=stats["hits"] / lookups if lookups else 0.0,
+                resident_mb=self._resident / 1e6,
+                budget_mb=self.budget / 1e6,
+                resident_images=len(self._lru),
+                images=len(self._entries),
+                spill_mb=sum(os.path.getsize(e.spill) for e in self._entries.values()
+                             if e.spill and os.path.exists(e.spill)) / 1e6,
+            )
+            return stats
+
+    # -- internals ----------------------------------------------------------
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.image is not None:
+                self._lru.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.image
+            self._stats["misses"] += 1
+            path, homography, size, spill = entry.path, entry.homography, entry.size, entry.spill
+
+        # Reload outside the lock; decoding takes long and two threads
+        # loading the same image at worst do the work twice
+        index, kind = key
+        if kind == PAGE and spill is None and homography is not None:
+            original = self.original(index)
+            image = cv2.warpPerspective(original, homography, size) if original is not None else None
+            counter = "rederived"
+        elif spill is not None:
+            image = cv2.imread(spill, cv2.IMREAD_UNCHANGED)
+            counter = "unspilled"
+        elif path is not None:
+            image = cv2.imread(path)
+            counter = "decodes"
+        else:
+            image, counter = None, None
+        if image is None:
+            return None
+
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return image  # replaced or removed meanwhile; hand out what we have
+            self._stats[counter] += 1
+            self._make_resident(key, image)
+        return image
+
+    def _make_resident(self, key, image):
+        entry = self._entries[key]
+        if key in self._lru:
+            self._resident -= self._lru.pop(key)
+        entry.image = image
+        self._lru[key] = image.nbytes
+        self._resident += image.nbytes
+        self._evict(keep=key)
+
+    def _evict(self, keep):
+        # Least recently used first; the image just used always stays
+        for key in list(self._lru):
+            if self._resident <= self.budget:
+                break
+            if key == keep:
+                continue
+            entry = self._entries[key]
+            if entry.path is None and entry.homography is None and entry.spill is None:
+                entry.spill = self._spill(key, entry.image)
+                if entry.spill is None:
+                    continue  # no way to get it back; keep it in RAM
+                self._stats["spilled"] += 1
+            self._resident -= self._lru.pop(key)
+            entry.image = None
+            self._stats["evictions"] += 1
+
+    def _spill(self, key, image):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="docsee_store_", dir=self._spill_root)
+        path = os.path.join(self._spill_dir, f"{key[0]}_{key[1]}.png")
+        try:
+            ok, data = cv2.imencode(".png", image, [cv2.IMWRITE_PNG_COMPRESSION, SPILL_PNG_LEVEL])
+            if not ok:
+                return None
+            with open(path, 'wb') as f:
+                f.write(data.tobytes())
+        except OSError as e:
+            print(f"[ImageStore ERROR] Could not spill {key} -> {e}")
+            return None
+        return path
+
+    def _drop(self, index, kind):
+        key = (index, kind)
+        entry = self._entries.pop(key, None)
+        if key in self._lru:
+            self._resident -= self._lru.pop(key)
+        if entry is not None and entry.spill is not None:
+            try:
+                os.remove(entry.spill)
+            except OSError:
+                pass
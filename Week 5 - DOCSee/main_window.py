@@ -6,6 +6,7 @@ from PyQt5.QtCore import QTimer, QPropertyAnimation, Qt
 from PyQt5.QtGui import QPixmap, QFont, QIcon
 from upload_pictures import UploadWindow, ManualSelector
 from webcam_page import WebcamWindow
+from reader_provider import get_reader_provider
 
 
 class MainWindow(QMainWindow):
@@ -22,6 +23,9 @@ class MainWindow(QMainWindow):
         self.show_splash()
 
     def show_splash(self):
+        # Load the EasyOCR models in the background while the splash is visible
+        get_reader_provider().start()
+
         pixmap = QPixmap("splash.png")
         self.label.setPixmap(pixmap)
 
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".docsee", "ocr_cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class DiskCache:
+    # Small files in one directory, one per key, capped at max_bytes. File
+    # mtimes double as the LRU clock. Subclasses choose the key and encoding.
+    SUFFIX = ".bin"
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._bytes = None  # approximate size on disk, measured lazily
+        os.makedirs(directory, exist_ok=True)
+
+    def get_bytes(self, key):
+        # Raw file contents, or None when missing or evicted by another
+        # process; callers count the hit or miss once they have decoded it
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        return data
+
+    def put_bytes(self, key, data):
+        # Write to a private temp file and rename it into place, so concurrent
+        # writers (threads or batch_ocr processes) never expose partial files
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"[{type(self).__name__} ERROR] Could not store {key} -> {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan_size()
+            else:
+                self._bytes += len(data)
+            over_budget = self._bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def evict(self):
+        # Drop least recently used entries until the cache fits its budget
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass  # already removed by another writer
+            total -= size
+
+        with self._lock:
+            self._bytes = total
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes": self._bytes if self._bytes is not None else self._scan_size(),
+            }
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _scan_size(self):
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SUFFIX):
+                try:
+                    total += os.path.getsize(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        return total
+
+
+class OCRCache(DiskCache):
+    # Content-addressed OCR results on disk: one small JSON file per
+    # (page pixels, OCR parameters) key
+    SUFFIX = ".json"
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(directory, max_bytes)
+
+    def key(self, image, params):
+        h = hashlib.blake2b(digest_size=20)
+        h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+        h.update(f"{image.shape}|{image.dtype}".encode("ascii"))
+        h.update(memoryview(np.ascontiguousarray(image)).cast("B"))
+        return h.hexdigest()
+
+    def get(self, key):
+        data = self.get_bytes(key)
+        try:
+            entries = json.loads(data.decode("utf-8")) if data is not None else None
+        except ValueError:
+            entries = None  # a torn file from a crash
+        self._count(entries is not None)
+        if entries is None:
+            return None
+        return [(entry["box"], entry["text"], entry["confidence"]) for entry in entries]
+
+    def put(self, key, results):
+        entries = [
+            {"box": [[int(x), int(y)] for x, y in box], "text": text, "confidence": float(conf)}
+            for box, text, conf in results
+        ]
+        self.put_bytes(key, json.dumps(entries, ensure_ascii=False).encode("utf-8"))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    # Process-wide cache shared by the upload and webcam windows
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OCRCache()
+        return _cache
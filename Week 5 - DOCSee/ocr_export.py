@@ -0,0 +1,141 @@
+import os
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+
+# hOCR and ALTO XML from the OCR results the windows already hold, so an
+# export never runs the model again. Results are EasyOCR's line tuples
+# (box, text, confidence) in the pixels of the page image; EasyOCR has no
+# word boxes, so words get slices of their line's box by character count.
+
+SOFTWARE_NAME = "DOCSee"
+ALTO_NAMESPACE = "http://www.loc.gov/standards/alto/ns-v4#"
+ALTO_SCHEMA = "http://www.loc.gov/alto/v4/alto-4-2.xsd"
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def box_bounds(box):
+    # (x0, y0, x1, y1) around a four-point box
+    xs = [int(round(x)) for x, _ in box]
+    ys = [int(round(y)) for _, y in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def reading_order(results):
+    # Lines top to bottom, then left to right, as the text popup shows them
+    return sorted(results, key=lambda line: (box_bounds(line[0])[1], box_bounds(line[0])[0]))
+
+
+def split_words(box, text):
+    # [(x0, y0, x1, y1, word)] sharing the line's width by character count
+    x0, y0, x1, y1 = box_bounds(box)
+    stripped = text.strip()
+    per_char = (x1 - x0) / (len(stripped) or 1)
+    out, pos = [], 0
+    for word in stripped.split():
+        start = stripped.index(word, pos)
+        pos = start + len(word)
+        out.append((int(x0 + start * per_char), y0, int(x0 + pos * per_char), y1, word))
+    return out
+
+
+def _write_atomic(path, chunks):
+    # Streams chunks to a temp file and renames it over path when complete
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _pages(count, page_source, progress):
+    # (page number, width, height, results) for every page that exists
+    number = 0
+    for i in range(count):
+        page = page_source(i)
+        if page is not None:
+            number += 1
+            width, height, results = page
+            yield number, width, height, reading_order(results or [])
+        if progress is not None and progress(i + 1, count) is False:
+            raise ExportCancelled()
+
+
+def write_hocr(path, count, page_source, progress=None):
+    # page_source(i) gives (width, height, results) for page i, or None to
+    # skip it; progress works as in pdf_export.write_pdf
+    def chunks():
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"\n'
+               '    "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">\n'
+               '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">\n'
+               '<head>\n'
+               '  <title></title>\n'
+               '  <meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>\n'
+               f'  <meta name="ocr-system" content="{SOFTWARE_NAME} (EasyOCR)"/>\n'
+               '  <meta name="ocr-capabilities" content="ocr_page ocr_line ocrx_word"/>\n'
+               '</head>\n<body>\n')
+        for number, width, height, results in _pages(count, page_source, progress):
+            parts = [f'  <div class="ocr_page" id="page_{number}" '
+                     f'title="bbox 0 0 {width} {height}; ppageno {number - 1}">\n']
+            for n, (box, text, conf) in enumerate(results, 1):
+                x0, y0, x1, y1 = box_bounds(box)
+                wconf = int(round(conf * 100))
+                parts.append(f'    <span class="ocr_line" id="line_{number}_{n}" '
+                             f'title="bbox {x0} {y0} {x1} {y1}; x_wconf {wconf}">')
+                parts.append(" ".join(
+                    f'<span class="ocrx_word" id="word_{number}_{n}_{k}" '
+                    f'title="bbox {wx0} {wy0} {wx1} {wy1}; x_wconf {wconf}">{escape(word)}</span>'
+                    for k, (wx0, wy0, wx1, wy1, word) in enumerate(split_words(box, text), 1)))
+                parts.append('</span>\n')
+            parts.append('  </div>\n')
+            yield "".join(parts)
+        yield '</body>\n</html>\n'
+
+    _write_atomic(path, chunks())
+
+
+def write_alto(path, count, page_source, progress=None):
+    # ALTO v4 with one text block per page; same arguments as write_hocr
+    def chunks():
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               f'<alto xmlns="{ALTO_NAMESPACE}" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"\n'
+               f'      xsi:schemaLocation="{ALTO_NAMESPACE} {ALTO_SCHEMA}">\n'
+               '  <Description>\n'
+               '    <MeasurementUnit>pixel</MeasurementUnit>\n'
+               '    <OCRProcessing ID="OCR_0"><ocrProcessingStep><processingSoftware>'
+               f'<softwareName>{SOFTWARE_NAME}</softwareName>'
+               '</processingSoftware></ocrProcessingStep></OCRProcessing>\n'
+               '  </Description>\n  <Layout>\n')
+        for number, width, height, results in _pages(count, page_source, progress):
+            parts = [f'    <Page ID="page_{number}" PHYSICAL_IMG_NR="{number}" WIDTH="{width}" HEIGHT="{height}">\n',
+                     f'      <PrintSpace HPOS="0" VPOS="0" WIDTH="{width}" HEIGHT="{height}">\n']
+            if results:
+                bounds = [box_bounds(box) for box, _, _ in results]
+                bx0, by0 = min(b[0] for b in bounds), min(b[1] for b in bounds)
+                bx1, by1 = max(b[2] for b in bounds), max(b[3] for b in bounds)
+                parts.append(f'        <TextBlock ID="block_{number}" HPOS="{bx0}" VPOS="{by0}" '
+                             f'WIDTH="{bx1 - bx0}" HEIGHT="{by1 - by0}">\n')
+                for n, ((box, text, conf), (x0, y0, x1, y1)) in enumerate(zip(results, bounds), 1):
+                    parts.append(f'          <TextLine ID="line_{number}_{n}" HPOS="{x0}" VPOS="{y0}" '
+                                 f'WIDTH="{x1 - x0}" HEIGHT="{y1 - y0}">')
+                    parts.append("<SP/>".join(
+                        f'<String ID="string_{number}_{n}_{k}" HPOS="{wx0}" VPOS="{wy0}" WIDTH="{wx1 - wx0}" '
+                        f'HEIGHT="{wy1 - wy0}" CONTENT={quoteattr(word)} WC="{conf:.2f}"/>'
+                        for k, (wx0, wy0, wx1, wy1, word) in enumerate(split_words(box, text), 1)))
+                    parts.append('</TextLine>\n')
+                parts.append('        </TextBlock>\n')
+            parts.append('      </PrintSpace>\n    </Page>\n')
+            yield "".join(parts)
+        yield '  </Layout>\n</alto>\n'
+
+    _write_atomic(path, chunks())
@@ -0,0 +1,254 @@
+import math
+import re
+import cv2
+import numpy as np
+
+from geometry import four_point_transform
+from ocr_preprocess import OCRPreprocessor
+
+# Qt-free document pipeline: decode -> detect -> warp -> preprocess -> OCR.
+# Shared by the GUI (UploadWindow / OCRWorker) and the headless batch_ocr.py CLI.
+
+MIN_CONFIDENCE = 0.4
+MIN_TEXT_LENGTH = 2
+TEXT_PATTERN = re.compile(r'^[-•*]?\s*[A-Z0-9][\w\s.,:;()\-+*/=%&!?"\']+$')
+
+# Text-line crops sent through the recognizer per forward pass
+RECOGNITION_BATCH_SIZE = 32
+
+# Document outlines are searched on a copy at most this many pixels on its
+# long side, then each corner is refined at full resolution in a window of
+# REFINE_RADIUS pixels per unit of downscale (never less than MIN_REFINE_RADIUS)
+DETECT_SIDE = 800
+REFINE_RADIUS = 2.0
+MIN_REFINE_RADIUS = 5
+
+# Everything besides preprocessing that changes OCR output for the same
+# pixels; combined with OCRPreprocessor.params() into the cache key
+OCR_PARAMS = {
+    "version": 3,
+    "languages": ["en"],
+    "min_confidence": MIN_CONFIDENCE,
+    "min_text_length": MIN_TEXT_LENGTH,
+    "text_pattern": TEXT_PATTERN.pattern,
+}
+
+
+def find_document_corners(image, detect_side=DETECT_SIDE, refine=True):
+    # Corners of the largest four-sided outline as a 4x2 float32 array in
+    # full-resolution pixels, or None. Edges and contours come from a small
+    # pyramid level; only the corner neighbourhoods are read at full size.
+    h, w = image.shape[:2]
+    factor = math.ceil(max(h, w) / detect_side)
+    if factor > 1:
+        # Whole-number factor on a view trimmed to a multiple of it: OpenCV's
+        # fast box-filter path, several times quicker than a fractional resize
+        trimmed = image[:h - h % factor, :w - w % factor]
+        small = cv2.resize(trimmed, (w // factor, h // factor), interpolation=cv2.INTER_AREA)
+    else:
+        small = image
+    scale = 1.0 / factor
+
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    edged = cv2.Canny(blurred, 75, 200)
+
+    contours, _ = cv2.findContours(edged, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    contours = sorted(contours, key=cv2.contourArea, reverse=True)[:5]
+
+    for c in contours:
+        peri = cv2.arcLength(c, True)
+        approx = cv2.approxPolyDP(c, 0.02 * peri, True)
+        if len(approx) == 4:
+            # Pixel centres of the small level back onto the full image
+            corners = (approx.reshape(4, 2).astype(np.float32) + 0.5) / scale - 0.5
+            if refine and scale < 1.0:
+                corners = refine_corners(image, corners, max(MIN_REFINE_RADIUS, REFINE_RADIUS / scale))
+            return corners
+
+    return None  # no document found
+
+
+def refine_corners(image, corners, radius):
+    # Sub-pixel corner positions from small full-resolution windows. A corner
+    # that drifts out of its window (texture, blur) keeps its coarse position.
+    h, w = image.shape[:2]
+    r = int(math.ceil(radius))
+    refined = corners.copy()
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 40, 0.01)
+    for i, (x, y) in enumerate(corners):
+        # Window padded so cornerSubPix never reads past the patch
+        x0, y0 = max(0, int(x) - 2 * r), max(0, int(y) - 2 * r)
+        x1, y1 = min(w, int(x) + 2 * r + 1), min(h, int(y) + 2 * r + 1)
+        patch = image[y0:y1, x0:x1]
+        if patch.ndim == 3:
+            patch = cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY)
+        point = np.array([[[x - x0, y - y0]]], dtype=np.float32)
+        win = min(r, (patch.shape[1] - 1) // 2 - 1, (patch.shape[0] - 1) // 2 - 1)
+        if win < 2:
+            continue  # corner too close to the image border to refine
+        cv2.cornerSubPix(cv2.GaussianBlur(patch, (3, 3), 0), point, (win, win), (-1, -1), criteria)
+        px, py = point[0, 0] + (x0, y0)
+        if abs(px - x) <= r and abs(py - y) <= r:
+            refined[i] = (px, py)
+    return refined
+
+
+def detect_document(image):
+    pts = find_document_corners(image)
+    if pts is None:
+        return None
+    return four_point_transform(image, pts)
+
+
+def ocr_params(preprocessor):
+    return dict(OCR_PARAMS, preprocess=preprocessor.params())
+
+
+def scale_results(results, scale):
+    # Map boxes found on a page resized by `scale` back to the page's own pixels
+    if scale == 1.0:
+        return results
+    return [
+        ([[int(round(x / scale)), int(round(y / scale))] for x, y in box], text, conf)
+        for box, text, conf in results
+    ]
+
+
+def filter_results(results):
+    # Keep confident results that look like real text lines
+    filtered = []
+    for res in results:
+        text = res[1].strip()
+        conf = res[2]
+
+        if conf < MIN_CONFIDENCE or len(text) < MIN_TEXT_LENGTH:
+            continue  # skip low confidence or meaningless short text
+
+        if TEXT_PATTERN.match(text):
+            filtered.append(res)
+    return filtered
+
+
+def detect_text(gray, reader):
+    # CRAFT detection only; returns this page's horizontal and free-form boxes
+    horizontal_list, free_list = reader.detect(gray)
+    return horizontal_list[0], free_list[0]
+
+
+def recognize_batched(reader, pages, batch_size=RECOGNITION_BATCH_SIZE, on_lines=None):
+    # pages: list of (gray, horizontal_list, free_list) from detect_text.
+    # Crops from every page are pooled and recognized batch_size at a time;
+    # results return per page. Pages are finished in order (the caller puts
+    # the most wanted one first) and within a page crops are bucketed by
+    # width so little padding is wasted. on_lines(page_no, lines) is called
+    # after every batch with the raw lines it produced for each page.
+    from easyocr.config import imgH
+    from easyocr.recognition import get_text
+    from easyocr.utils import get_image_list
+
+    results = []
+    crops = []  # (page number, position on page, (box, crop))
+    for page_no, (gray, horizontal_list, free_list) in enumerate(pages):
+        image_list, _ = get_image_list(horizontal_list, free_list, gray, model_height=imgH)
+        results.append([None] * len(image_list))
+        crops.extend((page_no, pos, item) for pos, item in enumerate(image_list))
+
+    ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+    crops.sort(key=lambda c: (c[0], c[2][1].shape[1]))
+    for start in range(0, len(crops), batch_size):
+        chunk = crops[start:start + batch_size]
+        width = math.ceil(max(item[1].shape[1] for _, _, item in chunk) / imgH) * imgH
+        recognized = get_text(reader.character, imgH, int(width), reader.recognizer, reader.converter,
+                              [item for _, _, item in chunk], ignore_char, batch_size=batch_size,
+                              workers=0, device=reader.device)
+        streamed = {}
+        for (page_no, pos, _), res in zip(chunk, recognized):
+            results[page_no][pos] = res
+            streamed.setdefault(page_no, []).append(res)
+        if on_lines is not None:
+            for page_no, lines in streamed.items():
+                on_lines(page_no, lines)
+
+    return results
+
+
+def run_ocr_batch(images, reader, batch_size=RECOGNITION_BATCH_SIZE, preprocessor=None, on_lines=None):
+    # on_lines(position, lines), if given, receives filtered lines of
+    # images[position] as soon as each recognition batch finishes
+    preprocessor = preprocessor or OCRPreprocessor()
+    pages = []
+    scales = []
+    for slot, image in enumerate(images):
+        gray, scale = preprocessor(image, slot)
+        horizontal_list, free_list = detect_text(gray, reader)
+        pages.append((gray, horizontal_list, free_list))
+        scales.append(scale)
+
+    def stream(page_no, lines):
+        lines = filter_results(scale_results(lines, scales[page_no]))
+        if lines:
+            on_lines(page_no, lines)
+
+    results = recognize_batched(reader, pages, batch_size, stream if on_lines else None)
+    return [filter_results(scale_results(page_results, scale)) for page_results, scale in zip(results, scales)]
+
+
+def run_ocr_cached(images, run_batch, cache=None, params=None):
+    # run_batch(positions) returns filtered results for images[positions].
+    # Cache lookups happen first, so hits never wait for the models to load
+    # or touch them at all. params defaults to the default preprocessor's.
+    results = [None] * len(images)
+    keys = [None] * len(images)
+    if cache is not None:
+        params = params or ocr_params(OCRPreprocessor())
+        for i, image in enumerate(images):
+            keys[i] = cache.key(image, params)
+            results[i] = cache.get(keys[i])
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        for i, result in zip(missing, run_batch(missing)):
+            results[i] = result
+            if cache is not None:
+                cache.put(keys[i], result)
+    return results
+
+
+def run_ocr(image, reader):
+    return run_ocr_batch([image], reader)[0]
+
+
+def results_to_json(results):
+    # EasyOCR boxes hold numpy scalars, which json cannot serialize
+    return [
+        {
+            "box": [[int(x), int(y)] for x, y in box],
+            "text": text,
+            "confidence": float(conf),
+        }
+        for box, text, conf in results
+    ]
+
+
+def process_page(path, reader, cache=None, preprocessor=None, corrector=None):
+    image = cv2.imread(path)
+    if image is None:
+        raise ValueError(f"Could not decode image: {path}")
+
+    # Fall back to the whole image when no document outline is found
+    doc = detect_document(image)
+    page = doc if doc is not None else image
+
+    preprocessor = preprocessor or OCRPreprocessor()
+    results = run_ocr_cached([page], lambda positions: run_ocr_batch([page], reader, preprocessor=preprocessor),
+                             cache, ocr_params(preprocessor))[0]
+    if corrector is not None:
+        results = corrector(results)
+    return {
+        "source": path,
+        "document_detected": doc is not None,
+        "width": page.shape[1],
+        "height": page.shape[0],
+        "lines": results_to_json(results),
+    }
@@ -0,0 +1,139 @@
+import cv2
+import numpy as np
+
+from enhance import PageEnhancer
+
+# OCR preprocessing: grayscale -> resolution governor -> enhancement
+# (enhance.py, off unless steps are given) -> unsharp mask.
+# OCRPreprocessor keeps its working buffers between pages, so a worker that
+# processes same-sized pages stops allocating full frames after the first one.
+
+# Unsharp mask applied before OCR: WEIGHT * gray - (WEIGHT - 1) * blur(SIGMA)
+SHARPEN_WEIGHT = 1.5
+SHARPEN_SIGMA = 1
+
+# Resolution governor: pages whose median character height falls outside
+# TEXT_HEIGHT_RANGE are rescaled to TARGET_TEXT_HEIGHT, where CRAFT and the
+# 64 px recognizer are already accurate. Scales are snapped to SCALE_STEP so
+# re-crops of the same page end up at the same resolution.
+TARGET_TEXT_HEIGHT = 22
+TEXT_HEIGHT_RANGE = (14, 32)
+MIN_SCALE = 0.25
+MAX_SCALE = 2.0
+SCALE_STEP = 0.125
+ESTIMATE_SIDE = 1000  # long side of the copy used to estimate text height
+
+
+class OCRPreprocessor:
+    # Stages are switched on and off per instance. Each page "slot" owns its
+    # own buffers: the array returned for a slot stays valid until that slot
+    # is used again, so a batch of N pages uses slots 0..N-1.
+
+    def __init__(self, governor=True, sharpen=True, sharpen_weight=SHARPEN_WEIGHT,
+                 sharpen_sigma=SHARPEN_SIGMA, target_text_height=TARGET_TEXT_HEIGHT, enhance=()):
+        self.governor = governor
+        self.sharpen = sharpen
+        self.sharpen_weight = sharpen_weight
+        self.sharpen_sigma = sharpen_sigma
+        self.target_text_height = target_text_height
+        self.enhancer = PageEnhancer(enhance) if enhance else None
+        self._buffers = {}
+
+    def params(self):
+        # Everything here changes the pixels EasyOCR sees; part of the cache key
+        params = {
+            "governor": self.governor,
+            "target_text_height": self.target_text_height,
+            "text_height_range": list(TEXT_HEIGHT_RANGE),
+            "scale_range": [MIN_SCALE, MAX_SCALE, SCALE_STEP],
+            "sharpen": self.sharpen,
+            "sharpen_weight": self.sharpen_weight,
+            "sharpen_sigma": self.sharpen_sigma,
+        }
+        if self.enhancer is not None:
+            params["enhance"] = self.enhancer.params()
+        return params
+
+    def __call__(self, image, slot=0):
+        # Returns the OCR-ready single-channel page and the scale applied to it
+        # Step 1: Convert to grayscale (already-gray input is used as is)
+        if image.ndim == 2:
+            gray = image
+        else:
+            gray = self._buffer(slot, "gray", image.shape[:2])
+            cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=gray)
+
+        # Step 2: Rescale so text lands in the recognizer's sweet spot
+        scale = self.scale_for(gray, slot) if self.governor else 1.0
+        if scale != 1.0:
+            h, w = gray.shape
+            size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+            scaled = self._buffer(slot, "scaled", (size[1], size[0]))
+            interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+            cv2.resize(gray, size, dst=scaled, interpolation=interpolation)
+            gray = scaled
+
+        # Step 3: Optional CLAHE / threshold / clean-up, on the rescaled page
+        if self.enhancer is not None:
+            gray = self.enhancer(gray)
+
+        # Step 4: Apply sharpening to emphasize text (pointless on black and white)
+        if self.sharpen and not (self.enhancer is not None and self.enhancer.bilevel):
+            blurred = self._buffer(slot, "blurred", gray.shape)
+            cv2.GaussianBlur(gray, (0, 0), self.sharpen_sigma, dst=blurred)
+            out = self._buffer(slot, "out", gray.shape)
+            cv2.addWeighted(gray, self.sharpen_weight, blurred, 1 - self.sharpen_weight, 0, dst=out)
+            gray = out
+
+        return gray, scale
+
+    def estimate_text_height(self, gray, slot=0):
+        # Median height of character-sized connected components, measured on a
+        # small copy of the page; None when the page has too little text to judge
+        h, w = gray.shape[:2]
+        shrink = min(1.0, ESTIMATE_SIDE / max(h, w))
+        if shrink < 1.0:
+            size = (max(1, int(w * shrink)), max(1, int(h * shrink)))
+            small = self._buffer(slot, "small", (size[1], size[0]))
+            cv2.resize(gray, size, dst=small, interpolation=cv2.INTER_AREA)
+        else:
+            small = gray
+
+        binary = self._buffer(slot, "binary", small.shape)
+        cv2.adaptiveThreshold(small, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 25, 15, dst=binary)
+        labels = self._buffer(slot, "labels", small.shape, np.int32)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(binary, labels=labels, connectivity=8)
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+
+        # Glyph-like blobs: not specks, not lines/borders, reasonably filled
+        glyphs = (heights >= 3) & (heights < small.shape[0] / 8) & \
+                 (widths <= heights * 3) & (areas >= 0.15 * widths * heights)
+        if np.count_nonzero(glyphs) < 20:
+            return None
+        return float(np.median(heights[glyphs])) / shrink
+
+    def scale_for(self, gray, slot=0):
+        text_height = self.estimate_text_height(gray, slot)
+        if text_height is None or TEXT_HEIGHT_RANGE[0] <= text_height <= TEXT_HEIGHT_RANGE[1]:
+            return 1.0
+        scale = self.target_text_height / text_height
+        scale = round(scale / SCALE_STEP) * SCALE_STEP
+        return float(min(MAX_SCALE, max(MIN_SCALE, scale)))
+
+    def _buffer(self, slot, name, shape, dtype=np.uint8):
+        key = (slot, name)
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buf
+        return buf
+
+
+def estimate_text_height(gray):
+    return OCRPreprocessor().estimate_text_height(gray)
+
+
+def governor_scale(gray):
+    return OCRPreprocessor().scale_for(gray)
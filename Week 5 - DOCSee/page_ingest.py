@@ -0,0 +1,148 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from geometry import warp_document
+from ocr_pipeline import find_document_corners
+from qt_render import downscale
+from thumbnail_cache import THUMB_SIZE
+
+
+def ingest_page(path, preview_size, thumbnails=None):
+    # Decode -> detect -> warp for one uploaded file, plus the small RGB
+    # images the GUI shows for it. Runs on a pool thread (OpenCV drops the GIL).
+    # The page thumbnail is remembered in the ThumbnailCache, if given.
+    image = cv2.imread(path)
+    if image is None:
+        raise ValueError(f"Could not decode image: {path}")
+
+    corners = find_document_corners(image)
+    if corners is not None:
+        page, homography = warp_document(image, corners)
+    else:
+        page, homography = None, None
+
+    shown = page if page is not None else image
+    thumbnail = downscale(shown, THUMB_SIZE, THUMB_SIZE)
+    preview = downscale(shown, *preview_size)
+    if thumbnails is not None:
+        thumbnails.put(thumbnails.key(path, "page"), thumbnail)
+    return image, page, homography, thumbnail, preview
+
+
+class PageIngestor(QObject):
+    # Quick thumbnails first (cache or reduced decode), so the whole strip
+    # fills in before any page is fully decoded
+    thumbnail_ready = pyqtSignal(int, object)
+    # index, decoded original, warped page (None when no document was
+    # found), homography, thumbnail, display-size preview
+    page_ready = pyqtSignal(int, object, object, object, object, object)
+    page_failed = pyqtSignal(int, str)
+    # pages finished, pages in this upload
+    progress = pyqtSignal(int, int)
+
+    # generation, index, result tuple or None, error message
+    _page_done = pyqtSignal(int, int, object, str)
+    _thumb_done = pyqtSignal(int, int, object)
+
+    def __init__(self, max_workers=None, thumbnails=None):
+        super().__init__()
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.thumbnails = thumbnails  # optional ThumbnailCache
+        self._delivered = set()
+        self._executor = None
+        self._futures = []
+        self._generation = 0
+        self._done = 0
+        self._total = 0
+        self._lock = threading.Lock()
+        self._page_done.connect(self._deliver)
+        self._thumb_done.connect(self._deliver_thumbnail)
+
+    def start(self, paths, preview_size):
+        # Replaces any upload still in progress; pages are queued in order,
+        # so the first ones (shown first) are ready first
+        self.cancel()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest")
+        with self._lock:
+            generation = self._generation
+        self._done = 0
+        self._total = len(paths)
+        self.progress.emit(0, self._total)
+        self._futures = []
+        if self.thumbnails is not None:
+            self._futures += [
+                self._executor.submit(self._run_thumbnail, generation, index, path)
+                for index, path in enumerate(paths)
+            ]
+        self._futures += [
+            self._executor.submit(self._run, generation, index, path, preview_size)
+            for index, path in enumerate(paths)
+        ]
+
+    def cancel(self):
+        # Queued pages are dropped; pages already being decoded finish, but
+        # their results are ignored
+        with self._lock:
+            self._generation += 1
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        self._delivered = set()
+        self._done = self._total = 0
+
+    def is_busy(self):
+        return self._done < self._total
+
+    def shutdown(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _run(self, generation, index, path, preview_size):
+        with self._lock:
+            if generation != self._generation:
+                return
+        try:
+            result = ingest_page(path, preview_size, self.thumbnails)
+        except Exception as e:
+            print(f"[PageIngestor ERROR] {path} -> {e}")
+            self._page_done.emit(generation, index, None, str(e))
+            return
+        self._page_done.emit(generation, index, result, "")
+
+    def _run_thumbnail(self, generation, index, path):
+        with self._lock:
+            if generation != self._generation:
+                return
+        try:
+            thumbnail = self.thumbnails.thumbnail(path)
+        except Exception as e:
+            print(f"[PageIngestor ERROR] Thumbnail {path} -> {e}")
+            return  # the full decode will report the failure
+        self._thumb_done.emit(generation, index, thumbnail)
+
+    def _deliver_thumbnail(self, generation, index, thumbnail):
+        with self._lock:
+            if generation != self._generation:
+                return
+        if index not in self._delivered:  # never replace the detected page's thumbnail
+            self.thumbnail_ready.emit(index, thumbnail)
+
+    def _deliver(self, generation, index, result, error):
+        # Runs on the GUI thread; drop pages of a replaced or cancelled upload
+        with self._lock:
+            if generation != self._generation:
+                return
+        self._done += 1
+        self._delivered.add(index)
+        if result is None:
+            self.page_failed.emit(index, error)
+        else:
+            self.page_ready.emit(index, *result)
+        self.progress.emit(self._done, self._total)
@@ -0,0 +1,248 @@
+import os
+import shutil
+import tempfile
+import zlib
+
+import cv2
+import numpy as np
+from PIL import Image
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from ocr_export import ExportCancelled, box_bounds
+
+# Page-at-a-time PDF writer. Every page is encoded, written and forgotten
+# before the next one is read, so peak memory is about one page whatever
+# the document length; the cross-reference table (a few bytes per object)
+# is the only thing that grows. Pages are JPEG images (DCTDecode), and JPEG
+# files that can be shown as they are get copied into the PDF untouched.
+# Black-and-white pages (enhance.py) are stored at 1 bit per pixel with
+# Flate instead, a fraction of the JPEG size for text. Given OCR results, a
+# page also gets an invisible text layer (render mode 3) over the image,
+# which makes the PDF searchable and selectable.
+
+PDF_JPEG_QUALITY = 75  # what PIL's PDF export used before
+PAGE_DPI = 72  # one pixel per point, the page size PIL's export gave
+COPY_CHUNK = 1024 * 1024
+BILEVEL_ZLIB_LEVEL = 6
+
+# Invisible text is set in Helvetica, one of the standard 14 fonts every
+# viewer has, so nothing is embedded; its ascent and descent (per em) fit
+# each line to the height of its box
+TEXT_FONT = "Helvetica"
+TEXT_ASCENT = 0.718
+TEXT_DESCENT = 0.207
+
+_COLOR_SPACES = {1: b"/DeviceGray", 3: b"/DeviceRGB"}
+
+
+def passthrough_jpeg(path):
+    # (width, height, components) of a JPEG that can go into the PDF byte
+    # for byte, else None: it must be baseline or progressive Gray/RGB and
+    # need no EXIF rotation (cv2.imread would have rotated it)
+    try:
+        with Image.open(path) as img:  # reads the headers only
+            if img.format != "JPEG" or img.mode not in ("L", "RGB"):
+                return None
+            if img.getexif().get(0x0112, 1) != 1:
+                return None
+            return img.width, img.height, len(img.getbands())
+    except (OSError, SyntaxError):
+        return None
+
+
+class PDFWriter:
+    # Writes to a temp file next to path and moves it into place on close(),
+    # so a failed or cancelled export never leaves a half-written PDF behind.
+    # Objects 1 and 2 (catalog, page tree) are written last, once every page
+    # is known; the others go out as soon as they are added.
+
+    def __init__(self, path):
+        self.path = path
+        fd, self._tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".pdf.tmp")
+        self._file = os.fdopen(fd, 'wb')
+        self._offsets = {}
+        self._next_id = 3
+        self._pages = []
+        self._font_id = None
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def add_image(self, image, quality=PDF_JPEG_QUALITY, text=None):
+        # BGR or grayscale ndarray, encoded to JPEG here. text: OCR results
+        # (box, text, confidence) in the image's pixels, for the text layer.
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Could not encode page as JPEG")
+        channels = 1 if image.ndim == 2 else 3
+        self._add_jpeg(image.shape[1], image.shape[0], channels, len(data), lambda f: f.write(data.tobytes()),
+                       text)
+
+    def add_bilevel(self, image, text=None):
+        # Single-channel black-and-white page (0 = ink, 255 = paper)
+        height, width = image.shape
+        data = zlib.compress(np.packbits(image > 127, axis=1).tobytes(), BILEVEL_ZLIB_LEVEL)
+        self._add_page(width, height, b"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode",
+                       len(data), lambda f: f.write(data), text)
+
+    def add_jpeg_file(self, path, text=None):
+        # Copies the file in without decoding it; False when it cannot be
+        # used as is (see passthrough_jpeg) and must go through add_image
+        info = passthrough_jpeg(path)
+        if info is None:
+            return False
+        width, height, channels = info
+
+        def copy(f):
+            with open(path, 'rb') as src:
+                shutil.copyfileobj(src, f, COPY_CHUNK)
+
+        self._add_jpeg(width, height, channels, os.path.getsize(path), copy, text)
+        return True
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % page for page in self._pages)
+        self._write_object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)))
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref = self._file.tell()
+        count = self._next_id
+        lines = [b"xref\n0 %d\n" % count, b"0000000000 65535 f \n"]
+        lines += [b"%010d 00000 n \n" % self._offsets[i] for i in range(1, count)]
+        self._file.write(b"".join(lines))
+        self._file.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, xref))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _add_jpeg(self, width, height, channels, length, write_data, text=None):
+        encoding = b"/ColorSpace %s /BitsPerComponent 8 /Filter /DCTDecode" % _COLOR_SPACES[channels]
+        self._add_page(width, height, encoding, length, write_data, text)
+
+    def _add_page(self, width, height, encoding, length, write_data, text=None):
+        image_id, content_id, page_id = self._reserve(3)
+
+        self._begin_object(image_id)
+        self._file.write(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d %s /Length %d >>\nstream\n"
+            % (width, height, encoding, length))
+        write_data(self._file)
+        self._file.write(b"\nendstream\nendobj\n")
+
+        page_w, page_h = width * 72 / PAGE_DPI, height * 72 / PAGE_DPI
+        content = b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (page_w, page_h)
+        fonts = b""
+        text_layer = self._text_layer(text, page_h) if text else b""
+        if text_layer:
+            content += b"\n" + text_layer
+            fonts = b" /Font << /F1 %d 0 R >>" % self._font()
+        self._write_object(content_id, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        self._write_object(
+            page_id,
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /XObject << /Im0 %d 0 R >>%s >> /Contents %d 0 R >>"
+            % (page_w, page_h, image_id, fonts, content_id))
+        self._pages.append(page_id)
+
+    def _text_layer(self, results, page_h):
+        # One invisible run per OCR line, stretched (Tz) to its box's width
+        scale = 72 / PAGE_DPI
+        ops = []
+        for box, text, _ in results:
+            x0, y0, x1, y1 = box_bounds(box)
+            text = text.strip().encode("cp1252", "replace").decode("cp1252")  # WinAnsiEncoding
+            if not text or x1 <= x0 or y1 <= y0:
+                continue
+            size = (y1 - y0) * scale / (TEXT_ASCENT + TEXT_DESCENT)
+            width = stringWidth(text, TEXT_FONT, size)
+            if width <= 0:
+                continue
+            stretch = 100 * (x1 - x0) * scale / width
+            baseline = page_h - y1 * scale + TEXT_DESCENT * size
+            ops.append(b"/F1 %.2f Tf %.2f Tz 1 0 0 1 %.2f %.2f Tm (%s) Tj"
+                       % (size, stretch, x0 * scale, baseline, _pdf_string(text)))
+        if not ops:
+            return b""
+        return b"BT 3 Tr\n" + b"\n".join(ops) + b"\nET"
+
+    def _font(self):
+        if self._font_id is None:
+            (self._font_id,) = self._reserve(1)
+            self._write_object(
+                self._font_id,
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>"
+                % TEXT_FONT.encode("ascii"))
+        return self._font_id
+
+    def _reserve(self, n):
+        ids = range(self._next_id, self._next_id + n)
+        self._next_id += n
+        return ids
+
+    def _begin_object(self, obj_id):
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(b"%d 0 obj\n" % obj_id)
+
+    def _write_object(self, obj_id, body):
+        self._begin_object(obj_id)
+        self._file.write(body + b"\nendobj\n")
+
+
+def _pdf_string(text):
+    data = text.encode("cp1252")
+    for char, escaped in ((b"\\", b"\\\\"), (b"(", b"\\("), (b")", b"\\)"), (b"\r", b"\\r"), (b"\n", b"\\n")):
+        data = data.replace(char, escaped)
+    return data
+
+
+def write_pdf(path, count, page_source, progress=None, text_source=None, enhancer=None):
+    # page_source(i) gives page i as an ndarray, as the path of an unmodified
+    # image file (copied in when it is a usable JPEG, else decoded), or None
+    # to skip it. text_source(i), if given, gives the page's OCR results (or
+    # None) for a searchable PDF. enhancer, an enhance.PageEnhancer, is run on
+    # every page first; bilevel ones are stored at 1 bit per pixel.
+    # progress(done, count) is called after every page and may return False
+    # to cancel, in which case nothing is written. Returns the number of
+    # pages written.
+    with PDFWriter(path) as writer:
+        for i in range(count):
+            page = page_source(i)
+            text = text_source(i) if text_source is not None and page is not None else None
+            if isinstance(page, str):
+                if enhancer is None and writer.add_jpeg_file(page, text=text):
+                    page = None  # copied in as it is
+                else:
+                    decoded = cv2.imread(page)
+                    if decoded is None:
+                        print(f"[PDFWriter ERROR] Could not decode page {i}: {page}")
+                    page = decoded
+            if page is not None:
+                if enhancer is not None:
+                    page = enhancer(page)
+                if enhancer is not None and enhancer.bilevel:
+                    writer.add_bilevel(page, text=text)
+                else:
+                    writer.add_image(page, text=text)
+            page = None  # let it go before the next one is read
+            if progress is not None and progress(i + 1, count) is False:
+                raise ExportCancelled()
+        if writer.page_count == 0:
+            raise ValueError("No valid images found.")
+        return writer.page_count
@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+from PyQt5.QtGui import QImage, QPixmap
+
+# ndarray -> Qt display path shared by the windows. Images are shrunk to the
+# size they are shown at with OpenCV's INTER_AREA first, and BGR buffers are
+# wrapped as they are (Format_BGR888, Qt >= 5.14), so the only full-frame
+# pass is the downscale and the only copy is the small one QPixmap makes.
+
+_HAS_BGR888 = hasattr(QImage, "Format_BGR888")
+
+
+def fit_size(width, height, max_width, max_height):
+    # Largest size with the same aspect ratio inside max_width x max_height
+    scale = min(max_width / width, max_height / height)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def downscale(image, max_width, max_height):
+    # Image shrunk to fit; returned as is when it already fits
+    h, w = image.shape[:2]
+    if w <= max_width and h <= max_height:
+        return image
+    size = fit_size(w, h, max_width, max_height)
+
+    # INTER_AREA has a fast path for whole-number factors only, so shrink by
+    # the largest one first (trimming the few rows/columns it does not
+    # divide) and finish the remaining < 2x step on the small image
+    factor = min(w // size[0], h // size[1])
+    if factor >= 2:
+        trimmed = image[:h - h % factor, :w - w % factor]
+        image = cv2.resize(trimmed, (w // factor, h // factor), interpolation=cv2.INTER_AREA)
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def to_qimage(image, rgb=False):
+    # QImage sharing the array's memory. The array is kept alive on the QImage,
+    # so the wrapper stays valid for as long as Python holds the QImage.
+    if image.dtype != np.uint8:
+        raise ValueError(f"Expected an 8-bit image, got {image.dtype}")
+    if image.ndim == 2:
+        fmt = QImage.Format_Grayscale8
+    elif image.shape[2] == 4:
+        fmt = QImage.Format_RGBA8888 if rgb else QImage.Format_ARGB32
+    elif rgb:
+        fmt = QImage.Format_RGB888
+    elif _HAS_BGR888:
+        fmt = QImage.Format_BGR888
+    else:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)  # Qt < 5.14
+        fmt = QImage.Format_RGB888
+
+    # Qt needs whole rows to be contiguous; views such as crops are not
+    if not image.flags["C_CONTIGUOUS"]:
+        image = np.ascontiguousarray(image)
+    h, w = image.shape[:2]
+    qimg = QImage(image.data, w, h, image.strides[0], fmt)
+    qimg._array = image
+    return qimg
+
+
+def to_pixmap(image, max_width=None, max_height=None, rgb=False):
+    # Display-size QPixmap of a BGR (or rgb=True) image; QPixmap.fromImage
+    # copies the pixels, so the array may change right after this returns
+    if max_width is not None and max_height is not None:
+        image = downscale(image, max_width, max_height)
+    return QPixmap.fromImage(to_qimage(image, rgb))
@@ -0,0 +1,81 @@
+import threading
+import traceback
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class ReaderProvider(QObject):
+    # Emitted once the EasyOCR models are loaded, with the device in use ("cuda" / "cpu")
+    ready = pyqtSignal(str)
+    # Emitted if the reader could not be created at all
+    failed = pyqtSignal(str)
+
+    def __init__(self, languages=('en',), gpu=True):
+        super().__init__()
+        self.languages = list(languages)
+        self.gpu = gpu
+        self.device = None
+        self.error = None
+        self._reader = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+
+    def start(self):
+        # Safe to call many times; only the first call starts the warm-up thread
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name="easyocr-warmup", daemon=True)
+                self._thread.start()
+
+    def is_ready(self):
+        return self._loaded.is_set() and self._reader is not None
+
+    def get(self, timeout=None):
+        # Blocks until the reader exists; call from worker threads, not the GUI thread
+        self.start()
+        if not self._loaded.wait(timeout):
+            raise TimeoutError("EasyOCR reader is still loading")
+        if self._reader is None:
+            raise RuntimeError(f"EasyOCR reader unavailable: {self.error}")
+        return self._reader
+
+    def _load(self):
+        try:
+            # Imported here so torch/easyocr never slow down the splash screen
+            import torch
+            from easyocr import Reader
+
+            reader = None
+            if self.gpu and torch.cuda.is_available():
+                try:
+                    reader = Reader(self.languages, gpu=True, verbose=False)
+                except Exception as e:
+                    print(f"[ReaderProvider] GPU init failed, falling back to CPU -> {e}")
+            if reader is None:
+                reader = Reader(self.languages, gpu=False, verbose=False)
+
+            self._reader = reader
+            self.device = str(reader.device)
+        except Exception as e:
+            self.error = str(e)
+            traceback.print_exc()
+        finally:
+            self._loaded.set()
+
+        if self._reader is not None:
+            self.ready.emit(self.device)
+        else:
+            self.failed.emit(self.error)
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_reader_provider():
+    # Process-wide provider shared by the upload and webcam windows
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = ReaderProvider()
+        return _provider
@@ -0,0 +1,281 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zlib
+
+import numpy as np
+
+# Post-OCR spell correction with SymSpell. The delete index (every dictionary
+# word with up to MAX_EDIT_DISTANCE characters removed from its prefix) is
+# built once and stored as flat .npy arrays that are memory-mapped on load,
+# so starting the app costs a few milliseconds instead of a dictionary rebuild.
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".docsee", "spell_index")
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+# Only words from lines EasyOCR was unsure about are corrected; confident
+# lines keep their names, codes and jargon untouched
+CORRECT_BELOW = 0.8
+# Short words have too many close neighbours to be corrected safely
+MIN_WORD_LENGTH = 4
+WORD_PATTERN = re.compile(r"\b[A-Za-z]+\b")
+
+INDEX_VERSION = 1
+_INDEX_FILES = ("keys", "postings", "word_keys", "word_ids", "words", "offsets", "counts")
+
+
+def default_dictionary():
+    # English word frequencies shipped with symspellpy (82,765 words)
+    import symspellpy
+    return os.path.join(os.path.dirname(symspellpy.__file__), "frequency_dictionary_en_82_765.txt")
+
+
+def _deletes(word, max_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+    # The word's prefix plus every string reachable from it by deleting up to
+    # max_distance characters (SymSpell's symmetric delete candidates)
+    found = set()
+    for level in _delete_levels(word, max_distance, prefix_length):
+        found |= level
+    return found
+
+
+def _delete_levels(word, max_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+    # Same strings grouped by how many characters were deleted
+    level = {word[:prefix_length]}
+    levels = [level]
+    seen = set(level)
+    for _ in range(max_distance):
+        level = {w[:i] + w[i + 1:] for w in level if len(w) > 1 for i in range(len(w))} - seen
+        seen |= level
+        levels.append(level)
+    return levels
+
+
+def _hash(text):
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def build_index(directory=DEFAULT_INDEX_DIR, dictionary_path=None,
+                max_edit_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+    # Reads a "word count" per line frequency file and writes the index.
+    # Delete strings are stored as sorted crc32 keys next to the id of the
+    # word they came from; hash collisions only add candidates, which are
+    # verified by edit distance at lookup time anyway. Whole words get a
+    # second, smaller table of the same shape for exact-match checks.
+    dictionary_path = dictionary_path or default_dictionary()
+    words, counts = [], []
+    with open(dictionary_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                words.append(parts[0].lower())
+                counts.append(int(parts[1]))
+
+    keys, postings = [], []
+    for word_id, word in enumerate(words):
+        for delete in _deletes(word, max_edit_distance, prefix_length):
+            keys.append(_hash(delete))
+            postings.append(word_id)
+    keys = np.array(keys, dtype=np.uint32)
+    order = np.argsort(keys, kind="stable")
+    word_keys = np.array([_hash(word) for word in words], dtype=np.uint32)
+    word_order = np.argsort(word_keys, kind="stable")
+
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    arrays = {
+        "keys": keys[order],
+        "postings": np.array(postings, dtype=np.uint32)[order],
+        "word_keys": word_keys[word_order],
+        "word_ids": word_order.astype(np.uint32),
+        "words": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "offsets": offsets,
+        "counts": np.array(counts, dtype=np.int64),
+    }
+    meta = {
+        "version": INDEX_VERSION,
+        "dictionary": os.path.basename(dictionary_path),
+        "words": len(words),
+        "max_edit_distance": max_edit_distance,
+        "prefix_length": prefix_length,
+    }
+
+    # Build next to the target and rename into place, so a crash or a second
+    # process building at the same time never leaves a half-written index
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, name + ".npy"), array)
+        with open(os.path.join(tmp_dir, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        if os.path.isdir(directory) and not _is_complete(directory):
+            shutil.rmtree(directory, ignore_errors=True)  # leftover of an old or broken build
+        os.replace(tmp_dir, directory)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not _is_complete(directory):
+            raise  # nobody else finished a build either
+    return directory
+
+
+def _is_complete(directory):
+    try:
+        with open(os.path.join(directory, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get("version") == INDEX_VERSION and \
+        all(os.path.exists(os.path.join(directory, name + ".npy")) for name in _INDEX_FILES)
+
+
+def ensure_index(directory=DEFAULT_INDEX_DIR, dictionary_path=None):
+    if not _is_complete(directory):
+        build_index(directory, dictionary_path)
+    return directory
+
+
+class SpellIndex:
+    # Read-only view of an index written by build_index; the arrays stay on
+    # disk and the OS pages in only the parts lookups touch
+
+    def __init__(self, directory=DEFAULT_INDEX_DIR):
+        from symspellpy.editdistance import DistanceAlgorithm, EditDistance
+
+        with open(os.path.join(directory, "meta.json"), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.max_edit_distance = self.meta["max_edit_distance"]
+        self.prefix_length = self.meta["prefix_length"]
+        for name in _INDEX_FILES:
+            # Plain ndarray views of the maps: same pages, cheaper indexing
+            array = np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+            setattr(self, "_" + name, array.view(np.ndarray))
+        self._word_bytes = memoryview(self._words)
+        self._distance = EditDistance(DistanceAlgorithm.DAMERAU_OSA)
+
+    @classmethod
+    def load(cls, directory=DEFAULT_INDEX_DIR, dictionary_path=None):
+        # Builds the index on first use, then just maps it
+        return cls(ensure_index(directory, dictionary_path))
+
+    def word(self, word_id):
+        start, end = self._offsets[word_id:word_id + 2].tolist()
+        return str(self._word_bytes[start:end], "utf-8")
+
+    def contains(self, term):
+        key = _hash(term)
+        start, end = np.searchsorted(self._word_keys, [key, key + 1]).tolist()
+        return any(self.word(word_id) == term for word_id in self._word_ids[start:end].tolist())
+
+    def _postings_for(self, strings):
+        hashes = np.array([_hash(s) for s in strings], dtype=np.uint32)
+        starts = np.searchsorted(self._keys, hashes, side="left").tolist()
+        ends = np.searchsorted(self._keys, hashes, side="right").tolist()
+        for string, start, end in zip(strings, starts, ends):
+            if end > start:
+                yield string, self._postings[start:end].tolist()
+
+    def lookup(self, term):
+        # Closest dictionary word to a lowercase term as (word, distance),
+        # most frequent first among equally close words; None if nothing
+        # lies within max_edit_distance
+        if self.contains(term):
+            return term, 0  # most OCR words are spelled right; skip the distances
+
+        best = None  # (distance, count, word)
+        seen = set()
+        term_prefix = min(len(term), self.prefix_length)
+        for deleted, level in enumerate(_delete_levels(term, self.max_edit_distance, self.prefix_length)):
+            # Words first reached after `deleted` deletes from the term are at
+            # least that far away; nothing later can beat what was found
+            if best is not None and best[0] < deleted:
+                break
+            for delete, word_ids in self._postings_for(list(level)):
+                for word_id in word_ids:
+                    if word_id in seen:
+                        continue
+                    # A rarer word only wins by being strictly closer
+                    count = int(self._counts[word_id])
+                    if best is None:
+                        limit = self.max_edit_distance
+                    else:
+                        limit = best[0] if count > best[1] else best[0] - 1
+                    word = self.word(word_id)
+                    word_prefix = min(len(word), self.prefix_length)
+                    if limit < 1 or abs(len(word) - len(term)) > limit or len(word) < len(delete) or \
+                            (word_prefix > term_prefix and word_prefix - len(delete) > limit):
+                        continue
+                    seen.add(word_id)
+                    distance = self._distance.compare(term, word, limit)
+                    if distance >= 0:
+                        best = (distance, count, word)
+        return (best[2], best[0]) if best else None
+
+
+class SpellCorrector:
+    # Applies SpellIndex to OCR results: only lines below correct_below are
+    # touched, and only their alphabetic words of min_word_length or more
+
+    def __init__(self, index, correct_below=CORRECT_BELOW, min_word_length=MIN_WORD_LENGTH):
+        self.index = index
+        self.correct_below = correct_below
+        self.min_word_length = min_word_length
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, results):
+        return [
+            (box, self.correct_text(text) if conf < self.correct_below else text, conf)
+            for box, text, conf in results
+        ]
+
+    def correct_text(self, text):
+        return WORD_PATTERN.sub(lambda m: self.correct_word(m.group()), text)
+
+    def correct_word(self, word):
+        if len(word) < self.min_word_length:
+            return word
+        lower = word.lower()
+        with self._lock:
+            fixed = self._memo.get(lower)
+        if fixed is None:
+            hit = self.index.lookup(lower)
+            fixed = hit[0] if hit else lower
+            with self._lock:
+                if len(self._memo) > 50000:
+                    self._memo.clear()
+                self._memo[lower] = fixed
+        if fixed == lower:
+            return word
+
+        # Keep the casing of the OCR output
+        if word.isupper():
+            return fixed.upper()
+        if word[0].isupper():
+            return fixed.capitalize()
+        return fixed
+
+
+_corrector = None
+_corrector_failed = False
+_corrector_lock = threading.Lock()
+
+
+def get_spell_corrector():
+    # Process-wide corrector; None when the index cannot be built or loaded,
+    # in which case OCR results are simply left uncorrected
+    global _corrector, _corrector_failed
+    with _corrector_lock:
+        if _corrector is None and not _corrector_failed:
+            try:
+                _corrector = SpellCorrector(SpellIndex.load())
+            except Exception as e:
+                _corrector_failed = True
+                print(f"[SpellCorrector ERROR] Spell correction disabled -> {e}")
+        return _corrector
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+from ocr_cache import DiskCache
+
+DEFAULT_THUMB_DIR = os.path.join(os.path.expanduser("~"), ".docsee", "thumbnails")
+DEFAULT_THUMB_BYTES = 64 * 1024 * 1024
+THUMB_SIZE = 90
+THUMB_QUALITY = 90
+
+
+def reduced_thumbnail(path, size=THUMB_SIZE):
+    # BGR thumbnail that never decodes the full image when it can avoid it:
+    # for JPEGs, draft mode has libjpeg scale the DCT by 1/2..1/8 while
+    # decoding, to the smallest size still covering `size`
+    with Image.open(path) as img:
+        img.draft("RGB", (size, size))
+        img = ImageOps.exif_transpose(img)  # same orientation as cv2.imread
+        img = img.convert("RGB")
+        img.thumbnail((size, size), Image.BILINEAR)
+        return cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2BGR)
+
+
+class ThumbnailCache(DiskCache):
+    # Thumbnails on disk keyed by file path, mtime and size, so reopening a
+    # folder skips decoding entirely. kind separates the thumbnail of the
+    # file as is ("file") from that of its detected page ("page").
+    SUFFIX = ".jpg"
+
+    def __init__(self, directory=DEFAULT_THUMB_DIR, max_bytes=DEFAULT_THUMB_BYTES):
+        super().__init__(directory, max_bytes)
+
+    def key(self, path, kind="file", size=THUMB_SIZE):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{kind}|{size}".encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key):
+        image = self._load(key)
+        self._count(image is not None)
+        return image
+
+    def put(self, key, image):
+        if key is None:
+            return
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, THUMB_QUALITY])
+        if ok:
+            self.put_bytes(key, data.tobytes())
+
+    def thumbnail(self, path):
+        # Best thumbnail available for a file: its detected page if that was
+        # seen before, else the file itself, decoded at reduced size once
+        for kind in ("page", "file"):
+            cached = self._load(self.key(path, kind))
+            if cached is not None:
+                self._count(True)
+                return cached
+        self._count(False)
+        thumb = reduced_thumbnail(path)
+        self.put(self.key(path, "file"), thumb)
+        return thumb
+
+    def _load(self, key):
+        data = self.get_bytes(key) if key is not None else None
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR) if data else None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache()
+        return _cache
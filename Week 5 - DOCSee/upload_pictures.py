@@ -1,28 +1,43 @@
 import numpy as np
 from PyQt5.QtCore import Qt, QSize, QRect
-from PyQt5.QtGui import QFont, QPixmap, QPainter, QPen, QImage
+from PyQt5.QtGui import QFont, QPainter, QPen
 from PyQt5.QtWidgets import (
-    QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QWidget,
+    QApplication, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QWidget,
     QSizePolicy, QFileDialog, QScrollArea, QDialog, QRubberBand, QMessageBox, QProgressBar, QPlainTextEdit
 )
 import cv2
-from PIL import Image
 from datetime import datetime
-from easy_ocr import OCRWorker
-from easyocr import Reader
-
-easyocr_reader = Reader(['en'], gpu=True)
-
-class UploadWindow(QWidget):
+from easy_ocr import OCRResultsMixin, OCRScheduler, gui_preprocess_options
+from image_store import ImageStore
+from geometry import PageWarp
+from page_ingest import PageIngestor
+from export_dialog import export_pages
+from pdf_export import passthrough_jpeg
+from qt_render import to_pixmap
+from thumbnail_cache import THUMB_SIZE, get_thumbnail_cache
+from ocr_cache import get_ocr_cache
+from reader_provider import get_reader_provider
+
+class UploadWindow(OCRResultsMixin, QWidget):
     def __init__(self, go_back_callback=None):
         super().__init__()
         self.go_back_callback = go_back_callback
-        self.cv_images = {}  # Stores cropped images per index
+        self.images = ImageStore()  # Originals and crops per index, under a RAM budget
         self.image_paths = []  # Keeps track of image paths
         self.current_index = 0  # Tracks which image is being shown
         self.ocr_results = {}  # Stores OCR results by index
-        self.ocr_threads = []  # Stores running OCR threads
-
+        self.ocr_partial = {}  # Lines recognized so far for pages still in OCR
+        self.ocr_scheduler = OCRScheduler(get_reader_provider(), get_ocr_cache(),  # Bounded OCR worker pool
+                                          preprocess_options=gui_preprocess_options())
+        self.ocr_scheduler.lines_ready.connect(self.store_ocr_lines)
+        self.ocr_scheduler.result_ready.connect(self.store_ocr_result)
+        self.ocr_scheduler.failed.connect(self.store_ocr_failure)
+        self.ingestor = PageIngestor(thumbnails=get_thumbnail_cache())  # Decode/detect/warp off the GUI thread
+        self.ingestor.thumbnail_ready.connect(self.show_thumbnail)
+        self.ingestor.page_ready.connect(self.show_ingested_page)
+        self.ingestor.page_failed.connect(self.mark_failed_page)
+        self.ingestor.progress.connect(self.update_ingest_progress)
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
 
         # Main horizontal layout (left: buttons, right: image + thumbnails)
         main_layout = QHBoxLayout()
@@ -147,6 +162,26 @@ class UploadWindow(QWidget):
 
         right_panel.addWidget(self.thumbnail_scroll)
 
+        # Upload progress, shown while pages are still being detected
+        self.ingest_progress = QProgressBar()
+        self.ingest_progress.setFixedHeight(18)
+        self.ingest_progress.setFormat("Preparing pages: %v / %m")
+        self.ingest_progress.setAlignment(Qt.AlignCenter)
+        self.ingest_progress.setStyleSheet("""
+            QProgressBar {
+                background-color: #2b1f33;
+                border: 2px solid #6c5b7a;
+                border-radius: 8px;
+                color: white;
+                font-family: Verdana;
+            }
+            QProgressBar::chunk {
+                background-color: #8c78aa;
+            }
+        """)
+        self.ingest_progress.hide()
+        right_panel.addWidget(self.ingest_progress)
+
         # Add both panels to main layout
         main_layout.addLayout(left_panel_layout)
         main_layout.addLayout(right_panel)
@@ -154,15 +189,30 @@ class UploadWindow(QWidget):
 
     # go back button
     def go_back(self):
+        self.shutdown()
+        stats = self.images.stats()
+        print(f"[ImageStore] hits={stats['hits']} misses={stats['misses']} decodes={stats['decodes']} "
+              f"rederived={stats['rederived']} spilled={stats['spilled']} "
+              f"resident={stats['resident_mb']:.0f}/{stats['budget_mb']:.0f} MB")
+        self.images.clear()
         if self.go_back_callback:
             self.go_back_callback()
 
+    def shutdown(self):
+        # Stops ingestion (and its threads) and OCR; on leaving the window and
+        # when the application quits with the window still open
+        self.ingestor.shutdown()
+        self.ocr_scheduler.shutdown()
+
     # upload picture button
     def upload_picture(self):
         # Clear previous data
-        self.cv_images.clear()
+        self.images.clear()
         self.ocr_results.clear()
-        self.ocr_threads.clear()
+        self.ocr_partial.clear()
+        self.ocr_scheduler.cancel_all()
+        self.ingestor.cancel()
+        self.ingest_progress.hide()
         self.image_label.clear()
 
         file_paths, _ = QFileDialog.getOpenFileNames(self, "Select Images", "", "Images (*.png *.jpg *.jpeg *.bmp)")
@@ -170,7 +220,10 @@ class UploadWindow(QWidget):
             return
 
         self.image_paths = file_paths
+        for i, path in enumerate(file_paths):
+            self.images.set_original(i, path)
         self.current_index = 0
+        self.ocr_scheduler.set_current_index(0)
 
         # Remove previous thumbnails
         for i in reversed(range(self.thumbnail_layout.count())):
@@ -180,33 +233,26 @@ class UploadWindow(QWidget):
 
         # (devamı zaten sende var)
 
-        # Add thumbnails for each selected image
+        # Add a placeholder thumbnail for each selected image; the picture
+        # arrives from the thumbnail cache or a reduced-size decode, then is
+        # replaced by the detected page once that is ready
         for i, path in enumerate(file_paths):
-            thumb_label = QLabel()
-            thumb_label.setPixmap(QPixmap(path).scaled(90, 90, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            thumb_label = QLabel("…")
+            thumb_label.setAlignment(Qt.AlignCenter)
             thumb_label.setFixedSize(90, 90)
             thumb_label.setCursor(Qt.PointingHandCursor)
-            thumb_label.setStyleSheet("margin: 0px 3px;")
+            thumb_label.setStyleSheet("margin: 0px 3px; color: white;")
 
             # Define click handler for each thumbnail
             def make_click_handler(index):
                 def handler(event):
                     self.current_index = index
-                    if index in self.cv_images:
-                        # Show cropped image if exists
-                        cropped = self.cv_images[index]
-                        rgb = cv2.cvtColor(cropped, cv2.COLOR_BGR2RGB)
-                        h, w, ch = rgb.shape
-                        qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-                        pixmap = QPixmap.fromImage(qimg)
-                    else:
-                        # Show original image
-                        pixmap = QPixmap(self.image_paths[index])
-
-                    scaled_pixmap = pixmap.scaled(
-                        self.image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-                    )
-                    self.image_label.setPixmap(scaled_pixmap)
+                    self.ocr_scheduler.set_current_index(index)
+                    # Cropped image if it exists, else the original
+                    image = self.images.image(index)
+                    if image is None:
+                        return  # file could not be decoded
+                    self.image_label.setPixmap(to_pixmap(image, self.image_label.width(), self.image_label.height()))
                     self.image_label.repaint()
 
                 return handler
@@ -215,139 +261,69 @@ class UploadWindow(QWidget):
             thumb_label.mousePressEvent = make_click_handler(i)
             self.thumbnail_layout.addWidget(thumb_label)
 
-        # Run auto-detect for each image after loading
-        for i in range(len(self.image_paths)):
-            self.auto_detect_document(i)
-
-    def auto_detect_document(self, index):
-        try:
-            img_cv = cv2.imread(self.image_paths[index])
-            doc = self.detect_document(img_cv)
-            if doc is not None:
-                self.cv_images[index] = doc  # Save cropped result
-                self.start_ocr_thread(index, doc)
-
-                # Convert to pixmap and show
-                rgb = cv2.cvtColor(doc, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb.shape
-                qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(qimg)
-
-                scaled_pixmap = pixmap.scaled(
-                    self.image_label.width(),
-                    self.image_label.height(),
-                    Qt.KeepAspectRatio,
-                    Qt.SmoothTransformation
-                )
-                if index == self.current_index:
-                    self.image_label.setPixmap(scaled_pixmap)
-                    self.image_label.repaint()
-
-                # Update thumbnail
-                thumb_pixmap = pixmap.scaled(90, 90, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                thumb_widget = self.thumbnail_layout.itemAt(index).widget()
-                if thumb_widget:
-                    thumb_widget.setPixmap(thumb_pixmap)
-                    thumb_widget.repaint()
-        except Exception as e:
-            print(f"[Auto Detect Error] Image {index}: {e}")
-
-    def detect_document(self, image):
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        edged = cv2.Canny(blurred, 75, 200)
-
-        contours, _ = cv2.findContours(edged.copy(), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
-        contours = sorted(contours, key=cv2.contourArea, reverse=True)[:5]
-
-        for c in contours:
-            peri = cv2.arcLength(c, True)
-            approx = cv2.approxPolyDP(c, 0.02 * peri, True)
-            if len(approx) == 4:
-                pts = approx.reshape(4, 2)
-                return self.four_point_transform(image, pts)
-
-        return None  # no document found
-
-    def four_point_transform(self, image, pts):
-        rect = self.order_points(pts)
-        (tl, tr, br, bl) = rect
-
-        widthA = np.linalg.norm(br - bl)
-        widthB = np.linalg.norm(tr - tl)
-        maxWidth = int(max(widthA, widthB))
-
-        heightA = np.linalg.norm(tr - br)
-        heightB = np.linalg.norm(tl - bl)
-        maxHeight = int(max(heightA, heightB))
-
-        dst = np.array([
-            [0, 0],
-            [maxWidth - 1, 0],
-            [maxWidth - 1, maxHeight - 1],
-            [0, maxHeight - 1]], dtype="float32")
-
-        M = cv2.getPerspectiveTransform(rect, dst)
-        warped = cv2.warpPerspective(image, M, (maxWidth, maxHeight))
-        return warped
-
-    def order_points(self, pts):
-        rect = np.zeros((4, 2), dtype="float32")
-        s = pts.sum(axis=1)
-        rect[0] = pts[np.argmin(s)]
-        rect[2] = pts[np.argmax(s)]
-
-        diff = np.diff(pts, axis=1)
-        rect[1] = pts[np.argmin(diff)]
-        rect[3] = pts[np.argmax(diff)]
-        return rect
+        # Decode, detect and warp every page in the background
+        self.ingestor.start(self.image_paths, (self.image_label.width(), self.image_label.height()))
+
+    def show_thumbnail(self, index, thumbnail):
+        thumb_widget = self.thumbnail_layout.itemAt(index).widget()
+        if thumb_widget and not self.images.has_page(index):
+            thumb_widget.setPixmap(to_pixmap(thumbnail))
+
+    def show_ingested_page(self, index, original, doc, homography, thumbnail, preview):
+        if self.images.has_page(index):
+            return  # a manual crop made while the page was queued wins
+        # Keep the decoded original, so popups and manual selection need not decode again
+        self.images.set_original(index, self.image_paths[index], original)
+        if doc is not None:
+            self.images.put_page(index, doc, homography)  # Save cropped result
+            self.start_ocr_thread(index, doc, homography)
+
+        thumb_widget = self.thumbnail_layout.itemAt(index).widget()
+        if thumb_widget:
+            thumb_widget.setPixmap(to_pixmap(thumbnail))
+
+        if index == self.current_index:
+            self.image_label.setPixmap(to_pixmap(preview))
+
+    def mark_failed_page(self, index, error):
+        thumb_widget = self.thumbnail_layout.itemAt(index).widget()
+        if thumb_widget:
+            thumb_widget.setText("✕")
+            thumb_widget.setToolTip(error)
+
+    def update_ingest_progress(self, done, total):
+        self.ingest_progress.setRange(0, total)
+        self.ingest_progress.setValue(done)
+        self.ingest_progress.setVisible(done < total)
 
     def manual_selection(self):
         if not self.image_paths:
             QMessageBox.warning(self, "No image", "Please upload at least one image first.")
             return
 
-        image_path = self.image_paths[self.current_index]
-        dialog = ManualSelector(image_path, self)
+        original = self.images.original(self.current_index)
+        if original is None:
+            QMessageBox.warning(self, "No image", "This image could not be read.")
+            return
+        dialog = ManualSelector(original, self)
         if dialog.exec_() == QDialog.Accepted:
             cropped = dialog.get_cropped_image()
             if cropped is not None:
-                self.cv_images[self.current_index] = cropped
-
-                # Convert cropped image to QPixmap
-                rgb = cv2.cvtColor(cropped, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb.shape
-                qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(qimg)
+                self.images.put_page(self.current_index, cropped, dialog.homography)
 
                 # Resize and update main image
-                scaled_pixmap = pixmap.scaled(
-                    self.image_label.width(),
-                    self.image_label.height(),
-                    Qt.KeepAspectRatio,
-                    Qt.SmoothTransformation
-                )
-                self.image_label.setPixmap(scaled_pixmap)
+                self.image_label.setPixmap(to_pixmap(cropped, self.image_label.width(), self.image_label.height()))
                 self.image_label.repaint()
 
                 # Update thumbnail
-                thumb_pixmap = pixmap.scaled(90, 90, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                thumb_pixmap = to_pixmap(cropped, THUMB_SIZE, THUMB_SIZE)
                 thumb_widget = self.thumbnail_layout.itemAt(self.current_index).widget()
                 if thumb_widget:
                     thumb_widget.setPixmap(thumb_pixmap)
                     thumb_widget.repaint()
 
                 # 🔥 OCR thread başlat!
-                self.start_ocr_thread(self.current_index, cropped)
-
-    def start_ocr_thread(self, index, image):
-        worker = OCRWorker(index, image, easyocr_reader)  # reader parametresi veriliyor
-        worker.result_ready.connect(self.store_ocr_result)
-        self.ocr_threads.append(worker)
-        worker.start()
-
-    def store_ocr_result(self, index, result):
-        self.ocr_results[index] = result
+                self.start_ocr_thread(self.current_index, cropped, dialog.homography)
 
     def start_text_popup(self):
         if not self.image_paths:
@@ -356,55 +332,16 @@ class UploadWindow(QWidget):
 
         index = self.current_index
 
-        if index in self.ocr_results:
-            self.show_text_popup(index)
-            return
-
-        # Create waiting dialog
-        dialog = QDialog(self)
-        dialog.setWindowTitle("OCR in Progress")
-        dialog.setFixedSize(400, 150)
-        dialog.setStyleSheet("background-color: #3e2f4c;")
-
-        layout = QVBoxLayout(dialog)
+        # Pages where no document was found have not been queued yet
+        if index not in self.ocr_results and not self.ocr_scheduler.is_pending(index):
+            image = self.images.image(index)
+            if image is None:
+                QMessageBox.warning(self, "Unreadable image", "This image could not be decoded.")
+                return
+            self.start_ocr_thread(index, image)
 
-        label = QLabel("OCR is still preparing...")
-        label.setStyleSheet("color: white; font-size: 16px; font-family: Verdana;")
-        label.setAlignment(Qt.AlignCenter)
-
-        progress = QProgressBar()
-        progress.setRange(0, 0)  # Infinite loop
-        progress.setTextVisible(False)
-        progress.setStyleSheet("""
-            QProgressBar {
-                background-color: #2b1f33;
-                border: 2px solid #6c5b7a;
-                border-radius: 8px;
-            }
-            QProgressBar::chunk {
-                background-color: #8c78aa;
-            }
-        """)
-
-        layout.addStretch()
-        layout.addWidget(label)
-        layout.addSpacing(10)
-        layout.addWidget(progress)
-        layout.addStretch()
-
-        # Timer to check OCR status
-        def check_ready():
-            if index in self.ocr_results:
-                timer.stop()
-                dialog.accept()
-                QTimer.singleShot(100, lambda: self.show_text_popup(index))
-
-        from PyQt5.QtCore import QTimer
-        timer = QTimer()
-        timer.timeout.connect(check_ready)
-        timer.start(300)
-
-        dialog.exec_()
+        # The popup opens right away and fills in as lines are recognized
+        self.show_text_popup(index)
 
     def show_text_popup(self, index):
         try:
@@ -428,20 +365,18 @@ class UploadWindow(QWidget):
                     border: 2px solid #6c5b7a;
                 }
             """)
-            text = "\n".join([str(line[1]) for line in self.ocr_results[index]])
-            text_edit.setPlainText(text)
+            if index in self.ocr_results:
+                text = "\n".join([str(line[1]) for line in self.ocr_results[index]])
+                text_edit.setPlainText(text)
+            else:
+                self.stream_ocr_text(dialog, text_edit, index)
             content_layout.addWidget(text_edit, 2)
 
             # Image preview on the right
             image_label = QLabel()
             image_label.setAlignment(Qt.AlignCenter)
-            img_cv = self.cv_images[index] if index in self.cv_images else cv2.imread(self.image_paths[index])
-            rgb = cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb.shape
-            qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qimg)
-            scaled_pixmap = pixmap.scaled(450, 600, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            image_label.setPixmap(scaled_pixmap)
+            img_cv = self.images.image(index)
+            image_label.setPixmap(to_pixmap(img_cv, 450, 600))
             content_layout.addWidget(image_label, 1)
 
             # Main vertical layout
@@ -491,38 +426,24 @@ class UploadWindow(QWidget):
             QMessageBox.warning(self, "No images", "Please upload at least one image.")
             return
 
-        images = []
+        # Pages are written one at a time, so memory stays at about one page;
+        # the text layer / hOCR / ALTO come from the OCR results already held
+        export_pages(self, len(self.image_paths), self.pdf_page, self.ocr_results.get, self.images.size)
 
-        for i, path in enumerate(self.image_paths):
-            if i in self.cv_images:
-                img_cv = self.cv_images[i]
-            else:
-                img_cv = cv2.imread(path)
-
-            rgb = cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(rgb).convert("RGB")
-            images.append(pil_image)
-
-        if not images:
-            QMessageBox.warning(self, "No images", "No valid images found.")
-            return
-
-        # Generate file name
-        now = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        output_path, _ = QFileDialog.getSaveFileName(self, "Save PDF", f"scanned_{now}.pdf", "PDF Files (*.pdf)")
-        if not output_path:
-            return
-
-        # Save all images as a multi-page PDF
-        try:
-            images[0].save(output_path, save_all=True, append_images=images[1:])
-            QMessageBox.information(self, "Success", f"PDF saved:\n{output_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save PDF:\n{str(e)}")
+    def pdf_page(self, index):
+        # An untouched JPEG upload goes into the PDF as its original bytes
+        if self.images.has_page(index):
+            return self.images.page(index)
+        path = self.image_paths[index]
+        if passthrough_jpeg(path) is not None:
+            return path
+        return self.images.original(index)  # None for an unreadable file
 
 
 class ManualSelector(QDialog):
-    def __init__(self, image_path, parent=None):
+    # image: the picture to select corners on, as an ndarray (e.g. straight
+    # from the ImageStore or a webcam capture; it is only read) or a file path
+    def __init__(self, image, parent=None):
         super().__init__(parent)
 
         self.setWindowTitle("Select 4 Corners")
@@ -530,9 +451,9 @@ class ManualSelector(QDialog):
         self.setStyleSheet("background-color: #6c5b7a")
 
         self.points = []
-        self.image_path = image_path
-        self.original = cv2.imread(image_path)
-        self.image = self.original.copy()
+        self.homography = None  # original -> cropped page, set by get_cropped_image
+        self.image_path = image if isinstance(image, str) else None
+        self.original = cv2.imread(image) if isinstance(image, str) else image
 
         self.display_width = 800
         self.display_height = 600
@@ -542,7 +463,7 @@ class ManualSelector(QDialog):
         self.label.setStyleSheet("border: 2px solid white;")
 
         # Resize original image proportionally to fit 800x600
-        orig_h, orig_w = self.image.shape[:2]
+        orig_h, orig_w = self.original.shape[:2]
         self.scale_x = self.display_width / orig_w
         self.scale_y = self.display_height / orig_h
         self.scale = min(self.scale_x, self.scale_y)
@@ -551,12 +472,14 @@ class ManualSelector(QDialog):
         self.resized_h = int(orig_h * self.scale)
         self.offset_x = (self.display_width - self.resized_w) // 2
         self.offset_y = (self.display_height - self.resized_h) // 2
+        # Shrunk once; every click only redraws the markers on a copy
+        self.resized = cv2.resize(self.original, (self.resized_w, self.resized_h), interpolation=cv2.INTER_AREA)
 
         self.update_display()
         self.label.mousePressEvent = self.mouse_click
 
     def update_display(self):
-        resized = cv2.resize(self.image, (self.resized_w, self.resized_h))
+        resized = self.resized
         display = np.full((self.display_height, self.display_width, 3), (163, 121, 144), dtype=np.uint8)
         display[self.offset_y:self.offset_y+self.resized_h, self.offset_x:self.offset_x+self.resized_w] = resized
 
@@ -569,9 +492,7 @@ class ManualSelector(QDialog):
         if len(self.points) == 4:
             cv2.line(display, self.points[3], self.points[0], (255, 255, 255), 2)
 
-        rgb = cv2.cvtColor(display, cv2.COLOR_BGR2RGB)
-        qimg = QImage(rgb.data, self.display_width, self.display_height, self.display_width * 3, QImage.Format_RGB888)
-        self.label.setPixmap(QPixmap.fromImage(qimg))
+        self.label.setPixmap(to_pixmap(display))
 
     def mouse_click(self, event):
         x = event.pos().x()
@@ -601,39 +522,9 @@ class ManualSelector(QDialog):
             orig_y = int((y - self.offset_y) / self.scale)
             orig_points.append((orig_x, orig_y))
 
-        pts = np.array(orig_points, dtype="float32")
-        rect = self.order_points(pts)
-        (tl, tr, br, bl) = rect
-
-        widthA = np.linalg.norm(br - bl)
-        widthB = np.linalg.norm(tr - tl)
-        maxWidth = int(max(widthA, widthB))
-
-        heightA = np.linalg.norm(tr - br)
-        heightB = np.linalg.norm(tl - bl)
-        maxHeight = int(max(heightA, heightB))
-
-        dst = np.array([
-            [0, 0],
-            [maxWidth - 1, 0],
-            [maxWidth - 1, maxHeight - 1],
-            [0, maxHeight - 1]], dtype="float32")
-
-        M = cv2.getPerspectiveTransform(rect, dst)
-        warped = cv2.warpPerspective(self.original, M, (maxWidth, maxHeight))
-        return warped
-
-    def order_points(self, pts):
-        rect = np.zeros((4, 2), dtype="float32")
-        s = pts.sum(axis=1)
-        rect[0] = pts[np.argmin(s)]
-        rect[2] = pts[np.argmax(s)]
-
-        diff = np.diff(pts, axis=1)
-        rect[1] = pts[np.argmin(diff)]
-        rect[3] = pts[np.argmax(diff)]
-
-        return rect
+        warp = PageWarp(np.array(orig_points, dtype="float32"))
+        self.homography = warp.homography
+        return warp.apply(self.original)
 
 
 
@@ -1,36 +1,57 @@
-import cv2
-import numpy as np
 import os
-import atexit
 from datetime import datetime
-from PIL import Image
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QFont, QImage, QPixmap
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import (
     QWidget, QPushButton, QLabel, QVBoxLayout, QHBoxLayout,
-    QSizePolicy, QScrollArea, QMessageBox, QDialog, QFileDialog, QProgressBar, QPlainTextEdit
+    QSizePolicy, QScrollArea, QMessageBox, QDialog, QFileDialog, QPlainTextEdit
 )
-from easyocr import Reader
-from easy_ocr import OCRWorker
-
-easyocr_reader = Reader(['en'], gpu=True)
-
-
-class WebcamWindow(QWidget):
-    def __init__(self, go_back_callback=None):
+from easy_ocr import OCRResultsMixin, OCRScheduler, gui_preprocess_options
+from ocr_cache import get_ocr_cache
+from ocr_pipeline import find_document_corners
+from export_dialog import export_pages
+from frame_source import CAMERA_INDEX, open_source
+from geometry import warp_document
+from image_store import ImageStore
+from qt_render import to_pixmap
+from reader_provider import get_reader_provider
+from webcam_pipeline import WebcamPipeline
+
+STATS_INTERVAL = 0.5  # seconds between updates of the FPS / latency line
+# Decoded pages kept for display and export; beyond that, older pages of a
+# long scan are spilled to PNG files in a temporary directory, so memory
+# stays flat however many pages are scanned
+WEBCAM_STORE_MB = 16
+
+
+class WebcamWindow(OCRResultsMixin, QWidget):
+    # Queued from the pipeline's detection thread: session, preview, capture timestamp
+    _preview_ready = pyqtSignal(int, object, float)
+    # session, warped page
+    _page_captured = pyqtSignal(int, object)
+    # session whose source ran out (end of a replayed clip)
+    _source_ended = pyqtSignal(int)
+
+    def __init__(self, go_back_callback=None, source=None):
         super().__init__()
         self.go_back_callback = go_back_callback
-        self.detected_counter = 0
-        self.last_detected_corners = None
-        self.temp_files = []
-        self.captured_images = {}
+        # Camera index, or a recorded clip to replay (see frame_source.py)
+        self.source = source if source is not None else os.environ.get("DOCSEE_CAMERA", CAMERA_INDEX)
+        self.images = ImageStore(WEBCAM_STORE_MB)  # captured pages by index
         self.current_index = 0
-        self.timer = QTimer()
-        self.cap = None
+        self.pipeline = None  # WebcamPipeline while the camera is open
+        self._session = 0     # previews and captures of a stopped pipeline are dropped
+        self._stats_shown = 0.0
+        self._preview_ready.connect(self.show_preview)
+        self._page_captured.connect(self.store_capture)
+        self._source_ended.connect(self.source_ended)
         self.ocr_results = {}  # Stores OCR results by index
-        self.ocr_threads = []  # Stores OCR threads
-
-        atexit.register(self.cleanup_temp_files)
+        self.ocr_partial = {}  # Lines recognized so far for pages still in OCR
+        self.ocr_scheduler = OCRScheduler(get_reader_provider(), get_ocr_cache(),  # Bounded OCR worker pool
+                                          preprocess_options=gui_preprocess_options())
+        self.ocr_scheduler.lines_ready.connect(self.store_ocr_lines)
+        self.ocr_scheduler.result_ready.connect(self.store_ocr_result)
+        self.ocr_scheduler.failed.connect(self.store_ocr_failure)
 
         # Layout setup
         main_layout = QHBoxLayout()
@@ -47,6 +68,7 @@ class WebcamWindow(QWidget):
 
         buttons = [
             ("Open Webcam", self.open_webcam),
+            ("Continuous Scan", self.continuous_scan),
             ("Take Picture", self.take_picture),
             ("Manual Selection", self.manual_selection),
             ("Extract Text", self.start_text_popup),
@@ -73,6 +95,8 @@ class WebcamWindow(QWidget):
             btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
             btn.clicked.connect(func)
             button_layout.addWidget(btn)
+            if func == self.continuous_scan:
+                self.scan_button = btn
 
         button_group = QVBoxLayout()
         button_group.addStretch()
@@ -98,204 +122,150 @@ class WebcamWindow(QWidget):
         self.scroll_area.setStyleSheet("border: none;")
         right_panel.addWidget(self.scroll_area)
 
+        self.stats_label = QLabel()
+        self.stats_label.setStyleSheet("color: white;")
+        right_panel.addWidget(self.stats_label)
+
         main_layout.addLayout(left_panel)
         main_layout.addLayout(right_panel)
         self.setLayout(main_layout)
 
     def go_back(self):
-        if self.cap:
-            self.cap.release()
-        if self.timer.isActive():
-            self.timer.stop()
+        self.stop_webcam()
+        self.ocr_scheduler.shutdown()
+        self.images.clear()  # removes the spill files too
         if self.go_back_callback:
             self.go_back_callback()
 
-    def cleanup_temp_files(self):
-        for path in self.temp_files:
-            if os.path.exists(path):
-                try:
-                    os.remove(path)
-                except Exception as e:
-                    print(f"Could not delete {path}: {e}")
-
     def open_webcam(self):
-        self.cap = cv2.VideoCapture(1)
-        if not self.cap.isOpened():
+        # One capture, into the current page
+        self.start_webcam(continuous=False)
+
+    def continuous_scan(self):
+        # Every stable page goes into the next free index until stopped
+        if self.pipeline is not None and self.pipeline.continuous:
+            self.stop_webcam()
+            return
+        pages = self.images.pages()
+        self.current_index = pages[-1] + 1 if pages else 0
+        self.start_webcam(continuous=True)
+
+    def start_webcam(self, continuous):
+        self.stop_webcam()
+        source = open_source(self.source)
+        if not source.isOpened():
             QMessageBox.critical(self, "Error", "Could not open webcam.")
             return
-        self.detected_counter = 0
-        self.last_detected_corners = None
-        self.timer.timeout.connect(self.update_frame)
-        self.timer.start(30)
-
-    def update_frame(self):
-        ret, frame = self.cap.read()
-        if not ret:
+        self._session += 1
+        session = self._session
+        self.pipeline = WebcamPipeline(
+            on_preview=lambda preview, timestamp: self._preview_ready.emit(session, preview, timestamp),
+            on_capture=lambda page, corners: self._page_captured.emit(session, page),
+            continuous=continuous,
+            on_end=lambda: self._source_ended.emit(session),
+        )
+        self.pipeline.start(source)
+        if continuous:
+            self.scan_button.setText("Stop Scan")
+
+    def stop_webcam(self):
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self._report_stats()
+            if self.pipeline.continuous:
+                # Back on the last page scanned rather than the empty next one
+                pages = self.images.pages()
+                if pages and not self.images.has_page(self.current_index):
+                    self.current_index = pages[-1]
+                    self.display_captured(self.images.page(self.current_index))
+                self.scan_button.setText("Continuous Scan")
+            self.pipeline = None
+        self._session += 1
+
+    def source_ended(self, session):
+        # A replayed clip has played out: back to the stopped state
+        if session == self._session:
+            self.stop_webcam()
+
+    def show_preview(self, session, preview, timestamp):
+        # GUI thread: paint only
+        if session != self._session:
             return
-        frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-        self.cv_image = frame.copy()
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        edged = cv2.Canny(blurred, 50, 150)
-        contours, _ = cv2.findContours(edged.copy(), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
-        contours = sorted(contours, key=cv2.contourArea, reverse=True)[:5]
-
-        document_contour = None
-        for contour in contours:
-            peri = cv2.arcLength(contour, True)
-            approx = cv2.approxPolyDP(contour, 0.02 * peri, True)
-            if len(approx) == 4:
-                document_contour = approx
-                break
-
-        if document_contour is not None:
-            current_corners = document_contour.reshape(4, 2)
-            if self.last_detected_corners is not None:
-                diffs = [np.linalg.norm(c1 - c2) for c1, c2 in zip(current_corners, self.last_detected_corners)]
-                if np.mean(diffs) < 25:
-                    self.detected_counter += 1
-                else:
-                    self.detected_counter = 0
-            else:
-                self.detected_counter = 0
-            self.last_detected_corners = current_corners
-            cv2.drawContours(frame, [document_contour], -1, (0, 255, 0), 2)
-            if self.detected_counter >= 6:
-                self.timer.stop()
-                if self.cap:
-                    self.cap.release()
-                warped = self.four_point_transform(self.cv_image.copy(), current_corners)
-                self.captured_images[self.current_index] = warped
-                self.display_captured(warped)
-                self.start_ocr_thread(self.current_index, warped)
-                return
+        self.image_label.setPixmap(to_pixmap(preview))
+        self.pipeline.frame_shown(timestamp)
+        if timestamp - self._stats_shown >= STATS_INTERVAL:
+            self._stats_shown = timestamp
+            stats = self.pipeline.stats()
+            text = (f"capture {stats['capture_fps']:.0f} fps · detection {stats['detect_fps']:.0f} fps · "
+                    f"latency {stats['latency_ms']:.0f} ms")
+            if self.pipeline.continuous:
+                text += f" · {stats['captures']} page(s) scanned"
+            self.stats_label.setText(text)
+
+    def store_capture(self, session, warped):
+        if session != self._session:
+            return
+        index = self.current_index
+        self.images.put_page(index, warped)
+        self.start_ocr_thread(index, warped)  # OCR runs in the background either way
+        if self.pipeline.continuous:
+            self.current_index += 1  # the camera stays open for the next page
         else:
-            self.detected_counter = 0
-            self.last_detected_corners = None
-
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb.shape
-        qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qimg)
-        scaled = pixmap.scaled(640, 480, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.image_label.setPixmap(scaled)
-
-    def four_point_transform(self, image, pts):
-        rect = np.array(pts, dtype="float32")
-        s = rect.sum(axis=1)
-        diff = np.diff(rect, axis=1)
-        rect_ordered = np.zeros((4, 2), dtype="float32")
-        rect_ordered[0] = rect[np.argmin(s)]
-        rect_ordered[2] = rect[np.argmax(s)]
-        rect_ordered[1] = rect[np.argmin(diff)]
-        rect_ordered[3] = rect[np.argmax(diff)]
-        (tl, tr, br, bl) = rect_ordered
-        widthA = np.linalg.norm(br - bl)
-        widthB = np.linalg.norm(tr - tl)
-        heightA = np.linalg.norm(tr - br)
-        heightB = np.linalg.norm(tl - bl)
-        maxWidth = max(int(widthA), int(widthB))
-        maxHeight = max(int(heightA), int(heightB))
-        dst = np.array([[0, 0], [maxWidth - 1, 0], [maxWidth - 1, maxHeight - 1], [0, maxHeight - 1]], dtype="float32")
-        M = cv2.getPerspectiveTransform(rect_ordered, dst)
-        return cv2.warpPerspective(image, M, (maxWidth, maxHeight))
+            self.stop_webcam()  # already stopped itself; joins its threads and releases the camera
+            self.display_captured(warped)
+
+    def _report_stats(self):
+        stats = self.pipeline.stats()
+        print(f"[WebcamPipeline] capture={stats['capture_fps']:.1f} fps detection={stats['detect_fps']:.1f} fps "
+              f"latency={stats['latency_ms']:.0f} ms (p95 {stats['latency_p95_ms']:.0f} ms) "
+              f"dropped={stats['dropped']}")
+        self.stats_label.clear()
 
     def take_picture(self):
-        def take_picture(self):
-            if not hasattr(self, "cv_image") or self.cv_image is None:
-                QMessageBox.warning(self, "No Frame", "No webcam frame available to capture.")
-                return
-            self.timer.stop()
-            self.captured_images[self.current_index] = self.cv_image.copy()
-            self.display_captured(self.cv_image)
+        frame = self.pipeline.latest_frame() if self.pipeline is not None else None
+        if frame is None:
+            QMessageBox.warning(self, "No Frame", "No webcam frame available to capture.")
+            return
+        # During a continuous scan current_index is the next free page; taken
+        # before stop_webcam() moves it back onto the last page scanned
+        index = self.current_index
+        self.stop_webcam()
+        self.current_index = index
+        # Flattened as an uploaded photo is, when a page can be found in it
+        corners = find_document_corners(frame)
+        page = warp_document(frame, corners)[0] if corners is not None else frame
+        self.images.put_page(index, page)
+        self.display_captured(page)
+        self.start_ocr_thread(index, page)  # replaces any text of the old page
 
     def display_captured(self, image):
-        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb.shape
-        qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qimg)
-        scaled = pixmap.scaled(640, 480, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.image_label.setPixmap(scaled)
+        self.image_label.setPixmap(to_pixmap(image, 640, 480))
 
     def manual_selection(self):
-        if self.current_index not in self.captured_images:
+        if not self.images.has_page(self.current_index):
             QMessageBox.warning(self, "No Image", "Please take a picture first.")
             return
         from upload_pictures import ManualSelector
-        img = self.captured_images[self.current_index]
-        temp_path = f"temp_capture_{datetime.now().strftime('%H%M%S')}.jpg"
-        cv2.imwrite(temp_path, img)
-        self.temp_files.append(temp_path)
-        dialog = ManualSelector(temp_path, self)
+        dialog = ManualSelector(self.images.page(self.current_index), self)
         if dialog.exec_() == QDialog.Accepted:
             cropped = dialog.get_cropped_image()
             if cropped is not None:
-                self.captured_images[self.current_index] = cropped
+                self.images.put_page(self.current_index, cropped)
                 self.display_captured(cropped)
                 self.start_ocr_thread(self.current_index, cropped)
 
-    def start_ocr_thread(self, index, image):
-        worker = OCRWorker(index, image, easyocr_reader)
-        worker.result_ready.connect(self.store_ocr_result)
-        self.ocr_threads.append(worker)
-        worker.start()
-
-    def store_ocr_result(self, index, result):
-        self.ocr_results[index] = result
-
     def start_text_popup(self):
         index = self.current_index
 
-        if index not in self.captured_images:
+        if not self.images.has_page(index):
             QMessageBox.warning(self, "No Image", "Please take a picture first.")
             return
 
-        if index in self.ocr_results:
-            self.show_text_popup(index)
-            return
-
-        dialog = QDialog(self)
-        dialog.setWindowTitle("OCR in Progress")
-        dialog.setFixedSize(400, 150)
-        dialog.setStyleSheet("background-color: #3e2f4c;")
-
-        layout = QVBoxLayout(dialog)
-
-        label = QLabel("OCR is still preparing...")
-        label.setStyleSheet("color: white; font-size: 16px; font-family: Verdana;")
-        label.setAlignment(Qt.AlignCenter)
-
-        progress = QProgressBar()
-        progress.setRange(0, 0)
-        progress.setTextVisible(False)
-        progress.setStyleSheet("""
-            QProgressBar {
-                background-color: #2b1f33;
-                border: 2px solid #6c5b7a;
-                border-radius: 8px;
-            }
-            QProgressBar::chunk {
-                background-color: #8c78aa;
-            }
-        """)
-
-        layout.addStretch()
-        layout.addWidget(label)
-        layout.addSpacing(10)
-        layout.addWidget(progress)
-        layout.addStretch()
-
-        def check_ready():
-            if index in self.ocr_results:
-                timer.stop()
-                dialog.accept()
-                QTimer.singleShot(100, lambda: self.show_text_popup(index))
+        if index not in self.ocr_results and not self.ocr_scheduler.is_pending(index):
+            self.start_ocr_thread(index, self.images.page(index))
 
-        timer = QTimer()
-        timer.timeout.connect(check_ready)
-        timer.start(300)
-
-        dialog.exec_()
+        # The popup opens right away and fills in as lines are recognized
+        self.show_text_popup(index)
 
     def show_text_popup(self, index):
         try:
@@ -322,20 +292,18 @@ class WebcamWindow(QWidget):
                     border: 2px solid #6c5b7a;
                 }
             """)
-            text = "\n".join([str(line[1]) for line in self.ocr_results[index]])
-            text_edit.setPlainText(text)
+            if index in self.ocr_results:
+                text = "\n".join([str(line[1]) for line in self.ocr_results[index]])
+                text_edit.setPlainText(text)
+            else:
+                self.stream_ocr_text(dialog, text_edit, index)
             layout.addWidget(text_edit, 2)
 
             # Image preview on the right
             image_label = QLabel()
             image_label.setAlignment(Qt.AlignCenter)
-            img_cv = self.captured_images.get(index)
-            rgb = cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb.shape
-            qimg = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qimg)
-            scaled_pixmap = pixmap.scaled(450, 600, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            image_label.setPixmap(scaled_pixmap)
+            img_cv = self.images.page(index)
+            image_label.setPixmap(to_pixmap(img_cv, 450, 600))
             layout.addWidget(image_label, 1)
 
             # Add horizontal layout to main vertical layout
@@ -380,21 +348,13 @@ class WebcamWindow(QWidget):
             QMessageBox.critical(self, "Error", f"Failed to display OCR result:\n{str(e)}")
 
     def save_as_pdf(self):
-        if not self.captured_images:
+        indices = self.images.pages()
+        if not indices:
             QMessageBox.warning(self, "No Images", "No captured image found.")
             return
-        images = []
-        for img in self.captured_images.values():
-            rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(rgb).convert("RGB")
-            images.append(pil_image)
-        output_path, _ = QFileDialog.getSaveFileName(
-            self, "Save PDF", f"scanned_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.pdf", "PDF Files (*.pdf)"
+        export_pages(
+            self, len(indices),
+            lambda i: self.images.page(indices[i]),
+            lambda i: self.ocr_results.get(indices[i]),
+            lambda i: self.images.size(indices[i]),
         )
-        if not output_path:
-            return
-        try:
-            images[0].save(output_path, save_all=True, append_images=images[1:])
-            QMessageBox.information(self, "Success", f"PDF saved:\n{output_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save PDF:\n{str(e)}")
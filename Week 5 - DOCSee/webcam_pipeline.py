@@ -0,0 +1,296 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from doc_tracker import CornerTracker, SharpFrames, StabilityCounter, sharpness
+from geometry import FrameWarper
+from qt_render import downscale
+
+# Webcam scanning off the GUI thread. A capture thread reads and rotates
+# frames into a single-slot LatestFrame buffer, overwriting any frame nobody
+# has taken yet, so a slow frame further down never lets stale frames queue
+# up. A detection thread takes the newest frame, finds and tracks the page,
+# and hands a display-size preview (outline drawn) to on_preview; once the
+# page holds still it warps the sharpest frame of the still run (only frames
+# sharp enough count towards stability) and hands it to on_capture. Both callbacks run
+# on the detection thread; the GUI only has to paint what it is given.
+# A single-shot pipeline stops after its capture. A continuous one keeps
+# going and captures the next page once the captured one has been replaced
+# (its content changed) or taken away (no page seen for REARM_FRAMES frames).
+# Nothing here imports Qt widgets, so the loop also runs headless.
+
+PREVIEW_SIZE = (640, 480)
+RATE_WINDOW = 1.0      # seconds of history behind the FPS counters
+LATENCY_SAMPLES = 100  # recent frames behind the latency figures
+READ_RETRY = 0.01      # seconds to wait after a failed read
+REARM_FRAMES = 5       # frames without a page after which the next page may be captured
+SIGNATURE_WARP = 256   # side of the upright page that the signature is shrunk from
+SIGNATURE_SIZE = 32    # side of the page signature
+PAGE_CHANGE = 6.0      # mean signature difference (grey levels) that makes a new page
+
+
+class LatestFrame:
+    # One frame slot. put() replaces whatever is there; get() waits for a
+    # frame newer than the last one its caller saw.
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None  # (sequence number, frame, capture timestamp)
+        self._taken = 0
+        self._closed = False
+        self.dropped = 0   # frames overwritten before anyone took them
+
+    def put(self, frame, timestamp):
+        with self._cond:
+            seq = self._item[0] + 1 if self._item else 1
+            if self._item and self._item[0] > self._taken:
+                self.dropped += 1
+            self._item = (seq, frame, timestamp)
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def get(self, after=0, timeout=None):
+        # (seq, frame, timestamp) of a frame newer than `after`, or None on
+        # timeout, or once closed with nothing newer left
+        with self._cond:
+            self._cond.wait_for(lambda: self._closed or (self._item and self._item[0] > after), timeout)
+            if not self._item or self._item[0] <= after:
+                return None
+            self._taken = max(self._taken, self._item[0])
+            return self._item
+
+    def peek(self):
+        with self._cond:
+            return self._item[1] if self._item else None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class RateCounter:
+    # Events per second over the last RATE_WINDOW seconds
+
+    def __init__(self, window=RATE_WINDOW):
+        self.window = window
+        self._times = deque()
+        self._lock = threading.Lock()
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            self._times.append(now)
+            while self._times[0] < now - self.window:
+                self._times.popleft()
+
+    def rate(self):
+        with self._lock:
+            if len(self._times) < 2:
+                return 0.0
+            span = self._times[-1] - self._times[0]
+            return (len(self._times) - 1) / span if span > 0 else 0.0
+
+
+class WebcamPipeline:
+    # start(source) with an opened frame source (frame_source.py; a
+    # cv2.VideoCapture is one); it is released when the pipeline stops, which
+    # a single-shot one does by itself after its capture, and any one does
+    # when a replayed clip runs out (on_end is then called). One pipeline per
+    # session.
+
+    def __init__(self, on_preview=None, on_capture=None, preview_size=PREVIEW_SIZE, rotate=cv2.ROTATE_90_CLOCKWISE,
+                 continuous=False, latency_samples=LATENCY_SAMPLES, on_end=None):
+        self.on_preview = on_preview  # (BGR preview, capture timestamp)
+        self.on_capture = on_capture  # (warped BGR page, corners in the frame)
+        self.on_end = on_end          # () once the source has stopped delivering; not after stop()
+        self.preview_size = preview_size
+        self.rotate = rotate          # cv2.rotate code, or None
+        self.continuous = continuous
+        self.captures = 0
+        self.processed = 0
+        self._captured = None  # signature of the page last captured, until it is replaced
+        self._missing = 0      # frames in a row without a page since then
+        self.tracker = CornerTracker()
+        self.stability = StabilityCounter()
+        self.sharp = SharpFrames()
+        self.warper = FrameWarper()  # corners -> page, reused while the corners hold still
+        self.frames = LatestFrame()
+        self.capture_rate = RateCounter()
+        self.detect_rate = RateCounter()
+        self._latencies = deque(maxlen=latency_samples)  # None: every frame
+        self._stop = threading.Event()
+        self._ended = False    # the capture loop finished without stop()
+        self._threads = []
+        self._cap = None
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, source):
+        self._cap = source
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="webcam-capture", daemon=True),
+            threading.Thread(target=self._detect_loop, name="webcam-detect", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, wait=True):
+        self._stop.set()
+        self.frames.close()
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def wait(self, timeout=None):
+        # Until both threads have finished (after a capture or the end of a clip)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def latest_frame(self):
+        # Newest full-size frame (rotated), or None before the first one
+        return self.frames.peek()
+
+    def frame_shown(self, timestamp):
+        # Called once a preview is on screen, with the timestamp it came
+        # with: capture -> detection -> paint latency
+        self._latencies.append(time.perf_counter() - timestamp)
+
+    def stats(self):
+        latencies = np.array(self._latencies) * 1000
+        p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) if len(latencies) else (0.0, 0.0, 0.0)
+        return {
+            "capture_fps": self.capture_rate.rate(),
+            "detect_fps": self.detect_rate.rate(),
+            "latency_ms": float(latencies.mean()) if len(latencies) else 0.0,
+            "latency_p50_ms": float(p50),
+            "latency_p95_ms": float(p95),
+            "latency_p99_ms": float(p99),
+            "processed": self.processed,
+            "dropped": self.frames.dropped,
+            "captures": self.captures,
+        }
+
+    def _capture_loop(self):
+        try:
+            while not self._stop.is_set():
+                ret, frame = self._cap.read()
+                if not ret:
+                    if getattr(self._cap, "exhausted", False):
+                        break  # end of a replayed clip
+                    time.sleep(READ_RETRY)
+                    continue
+                timestamp = time.perf_counter()
+                if self.rotate is not None:
+                    frame = cv2.rotate(frame, self.rotate)
+                self.capture_rate.tick(timestamp)
+                self.frames.put(frame, timestamp)
+        except Exception as e:
+            print(f"[WebcamPipeline ERROR] capture -> {e}")
+        finally:
+            self._ended = not self._stop.is_set()
+            self._cap.release()
+            self.frames.close()
+
+    def _detect_loop(self):
+        seq = 0
+        try:
+            while not self._stop.is_set():
+                item = self.frames.get(seq, timeout=0.1)
+                if item is None:
+                    if self.frames.closed:
+                        break  # capture has ended and every frame is seen
+                    continue
+                seq, frame, timestamp = item
+                self._process(frame, timestamp)
+        except Exception as e:
+            print(f"[WebcamPipeline ERROR] detection -> {e}")
+            self.stop(wait=False)
+            return
+        if self._ended and self.on_end is not None:
+            self.on_end()  # every frame of the source has been processed
+
+    def _process(self, frame, timestamp):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        corners = self.tracker.update(gray)
+        self.detect_rate.tick()
+        self.processed += 1
+        if corners is None:
+            self.sharp.reset()
+            score = 0.0
+        else:
+            score = sharpness(gray, corners)
+        # The page just captured does not count towards the next capture, and
+        # a blurred frame neither counts nor breaks the run
+        waiting = self._captured is not None and self._still_captured(gray, corners)
+        if not waiting and (corners is None or self.sharp.sharp_enough(score)):
+            stable = self.stability.update(corners)
+            if self.stability.count == 0:
+                self.sharp.frames.clear()  # a new still run starts here
+            if corners is not None:
+                self.sharp.add(score, frame, corners)
+            if stable:
+                self._capture(gray, corners)
+                if not self.continuous:
+                    return
+
+        if self.on_preview is None:
+            return
+        preview = downscale(frame, *self.preview_size)
+        if preview is frame:
+            preview = frame.copy()  # the outline must not end up in latest_frame()
+        if corners is not None:
+            # Green while looking for a page, orange over the page just captured
+            color = (0, 160, 255) if self._captured is not None else (0, 255, 0)
+            scale = preview.shape[1] / frame.shape[1]
+            cv2.polylines(preview, [np.int32(corners * scale)], True, color, 2)
+        self.on_preview(preview, timestamp)
+
+    def _capture(self, gray, corners):
+        self.captures += 1
+        if not self.continuous:
+            self.stop(wait=False)
+        frame, frame_corners = self.sharp.sharpest()
+        page = self.warper(frame, frame_corners)
+        if self.on_capture is not None:
+            self.on_capture(page, frame_corners)
+        if self.continuous:
+            self._captured, self._missing = page_signature(gray, corners), 0
+            self.stability.reset()
+            self.sharp.reset()
+
+    def _still_captured(self, gray, corners):
+        # False (and the next page may be captured) once the captured page
+        # has gone for a while or something else is in its place
+        if corners is None:
+            self._missing += 1
+        else:
+            self._missing = 0
+            signature = page_signature(gray, corners)
+            if np.abs(signature - self._captured).mean() > PAGE_CHANGE:
+                self._captured = None
+                return False
+        if self._missing >= REARM_FRAMES:
+            self._captured = None
+            return False
+        return True
+
+
+def page_signature(gray, corners):
+    # Tiny upright view of the page with its mean brightness removed: the
+    # same page under a slightly different pose or light gives about the
+    # same signature, a page with different text does not
+    target = np.float32([[0, 0], [SIGNATURE_WARP, 0], [SIGNATURE_WARP, SIGNATURE_WARP], [0, SIGNATURE_WARP]])
+    M = cv2.getPerspectiveTransform(np.float32(corners), target)
+    upright = cv2.warpPerspective(gray, M, (SIGNATURE_WARP, SIGNATURE_WARP))
+    small = cv2.resize(upright, (SIGNATURE_SIZE, SIGNATURE_SIZE), interpolation=cv2.INTER_AREA).astype(np.float32)
+    return small - small.mean()